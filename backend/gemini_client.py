@@ -1,11 +1,20 @@
+import io
 import os
-import tempfile
+import json
+import time
+import random
+import asyncio
+import hashlib
+from collections import OrderedDict, deque
+from functools import lru_cache
 import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, DeadlineExceeded
 from dotenv import load_dotenv
-from docx2pdf import convert
-from pathlib import Path
-import streamlit as st
-from datetime import datetime
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from PyPDF2 import PdfReader, PdfWriter
+from llm_cache import LLMCache, unit_vector
 
 # Load environment variables
 load_dotenv()
@@ -13,136 +22,1381 @@ load_dotenv()
 # Configure Gemini API
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
+
+@lru_cache(maxsize=None)
+def get_model(model_name):
+    """One GenerativeModel per model name for the whole process, shared by every client"""
+    return genai.GenerativeModel(model_name)
+
+# Sections of a generated project proposal, in order: (title, points to cover)
+PROPOSAL_SECTIONS = (
+    ("EXECUTIVE SUMMARY & STRATEGIC ALIGNMENT", (
+        "Quantifiable business impact and ROI projections with timelines",
+        "Strategic alignment with client's long-term business objectives",
+        "Competitive advantage creation and market positioning benefits",
+        "Executive-level value propositions that resonate with C-suite decision makers",
+    )),
+    ("COMPANY PROFILE & COMPETITIVE DIFFERENTIATION", (
+        "Unique market position and proprietary methodologies",
+        "Industry-specific expertise and relevant case studies with measurable outcomes",
+        "Innovation track record and emerging technology adoption",
+        "Partnership ecosystem and vendor relationships",
+    )),
+    ("BUSINESS TRANSFORMATION VISION", (
+        "Comprehensive understanding of client's industry challenges and market forces",
+        "Digital transformation roadmap beyond immediate project scope",
+        "Change management strategy addressing cultural and organizational transformation",
+        "Future-state business capabilities and competitive positioning",
+    )),
+    ("SOLUTION ARCHITECTURE & INNOVATION", (
+        "Modern, scalable architecture with cloud-native approaches",
+        "AI/ML integration opportunities and data-driven insights",
+        "API-first design and microservices architecture where applicable",
+        "Security-by-design and compliance framework",
+        "Emerging technology integration roadmap (IoT, blockchain, etc.)",
+    )),
+    ("IMPLEMENTATION METHODOLOGY & RISK MITIGATION", (
+        "Agile/DevOps delivery methodology with continuous value delivery",
+        "Comprehensive risk assessment with quantified impact analysis",
+        "Scenario planning and contingency strategies",
+        "Quality assurance framework and success metrics",
+        "Stakeholder engagement and communication strategy",
+    )),
+    ("TEAM STRUCTURE & CAPABILITY BUILDING", (
+        "Senior leadership involvement and escalation procedures",
+        "Knowledge transfer and capability building programs",
+        "Center of Excellence establishment",
+        "Long-term skill development and certification roadmaps",
+    )),
+    ("FINANCIAL MODEL & VALUE REALIZATION", (
+        "Detailed cost-benefit analysis with NPV calculations",
+        "Phased investment approach with quick wins identification",
+        "Total Economic Impact (TEI) analysis",
+        "Cost optimization strategies and efficiency gains",
+        "Flexible pricing models and payment structures",
+    )),
+    ("RISK MANAGEMENT & BUSINESS CONTINUITY", (
+        "Enterprise risk assessment matrix with probability and impact scores",
+        "Business continuity planning and disaster recovery strategies",
+        "Vendor risk management and third-party dependencies",
+        "Compliance and regulatory risk mitigation",
+        "Change management risk assessment",
+    )),
+    ("INNOVATION & FUTURE ROADMAP", (
+        "Technology evolution strategy and platform extensibility",
+        "Industry 4.0 readiness and digital maturity advancement",
+        "Sustainability and ESG considerations",
+        "Competitive intelligence and market trend analysis",
+        "Long-term partnership and growth opportunities",
+    )),
+    ("SUCCESS METRICS & GOVERNANCE", (
+        "KPI framework with baseline establishment methodology",
+        "Business value measurement and tracking systems",
+        "Governance structure with executive oversight",
+        "Continuous improvement processes and feedback loops",
+        "Performance dashboards and reporting mechanisms",
+    )),
+    ("CLIENT SUCCESS ENABLEMENT", (
+        "User adoption acceleration programs",
+        "Training and certification pathways",
+        "Support model and service level agreements",
+        "Community building and best practice sharing",
+        "Continuous optimization and enhancement services",
+    )),
+    ("NEXT STEPS & PARTNERSHIP VISION", (
+        "Decision timeline and onboarding acceleration",
+        "Strategic partnership framework",
+        "Proof of concept or pilot program proposals",
+        "Long-term relationship and growth planning",
+    )),
+)
+
+PROPOSAL_GUIDELINES = """
+        FORMATTING REQUIREMENTS:
+        - Use professional markdown formatting with clear headings and subheadings
+        - Include tables for complex information (timelines, costs, risks)
+        - Add executive summary boxes for key value propositions
+        - Use bullet points for clarity and scanability
+        - Include quantified benefits wherever possible
+        - Ensure content is tailored to the specific industry and client context
+        - Write at an executive level that would impress C-suite decision makers
+        - Focus on business outcomes rather than just technical deliverables
+
+        TONE AND APPROACH:
+        - Strategic and consultative rather than purely technical
+        - Forward-thinking and innovation-focused
+        - Risk-aware but opportunity-driven
+        - Partnership-oriented rather than vendor-focused
+        - Quantified and metrics-driven where possible
+"""
+
+
+def format_proposal_section(number, title, points):
+    """Render one PROPOSAL_SECTIONS entry as a numbered prompt item"""
+    bullets = "\n".join(f"        - {point}" for point in points)
+    return f"        {number}. **{title}**:\n{bullets}"
+
+
+def proposal_section_instructions(number, title, points):
+    """Everything in a section prompt after the RFP and company profile"""
+    return f"""
+        You are writing ONE section of a {len(PROPOSAL_SECTIONS)}-section proposal; the other sections are written separately.
+        Write only the section below, starting with the heading "## {number}. {title}", and do not repeat other sections:
+
+{format_proposal_section(number, title, points)}
+
+{PROPOSAL_GUIDELINES}"""
+
+
+# The fixed part of each section prompt, rendered once at import
+PROPOSAL_SECTION_INSTRUCTIONS = tuple(
+    proposal_section_instructions(number, title, points)
+    for number, (title, points) in enumerate(PROPOSAL_SECTIONS, 1)
+)
+
+
+# Output settings for each proposal section, generated one section per request
+PROPOSAL_GENERATION_CONFIG = genai.types.GenerationConfig(
+    temperature=0.3,           # Slightly creative but focused
+    top_p=0.8,                # Nucleus sampling
+    top_k=40,                 # Top-k sampling
+    max_output_tokens=2048,   # Per section; twelve sections share no budget
+    candidate_count=1,        # Number of response candidates
+    stop_sequences=None,      # No stop sequences for max output
+)
+
+# Output cap for the one-page executive briefing; a page of prose is well under 2048 tokens
+BRIEF_GENERATION_CONFIG = genai.types.GenerationConfig(
+    max_output_tokens=2048,
+    candidate_count=1,
+)
+
+# Instructions for the RFP analyses; GeminiClient.run_prompt appends the inputs after them
+RFP_PROMPTS = {
+    "eligibility_analysis": """
+You are an experienced bid manager specializing in evaluating RFP eligibility. 
+Based on the RFP document and company profile given at the end, analyze whether the company meets the basic eligibility requirements to respond to this RFP.
+
+Provide a comprehensive eligibility analysis with the following sections:
+
+1. **Summary of Eligibility**:
+   - Overall assessment of eligibility (Fully Eligible, Partially Eligible, Not Eligible)
+   - Executive summary of key findings
+
+2. **Mandatory Requirements Analysis**:
+   - Table listing all mandatory requirements from the RFP
+   - For each requirement, indicate whether the company meets it (Met, Partially Met, Not Met)
+   - Provide justification for each assessment based on the company profile
+
+3. **Gap Analysis**:
+   - Identify any significant gaps between RFP requirements and company capabilities
+   - Suggest possible ways to address these gaps (partnerships, new hires, etc.)
+
+4. **Competitive Position**:
+   - Assess how well the company is positioned compared to likely competitors
+   - Identify any unique advantages or disadvantages
+
+5. **Recommendation**:
+   - Clear recommendation on whether to proceed with a proposal
+   - If proceeding, note any special considerations that should be addressed in the proposal
+
+Format your response in markdown, with clear headings, tables, and bullet points.
+Use factual, objective language based strictly on the information provided.
+""",
+    "competitive_analysis": """
+Analyze the competitive landscape for the RFP given at the end and provide strategic positioning recommendations for the company profiled there.
+
+Provide:
+1. **Likely Competitors**: Who else will bid on this RFP?
+2. **Competitive Advantages**: What are our unique differentiators?
+3. **Competitive Threats**: Where might we be at a disadvantage?
+4. **Positioning Strategy**: How should we position our proposal?
+5. **Win Themes**: Key messages that will differentiate us
+6. **Price Strategy**: Competitive pricing considerations
+
+Format in markdown with actionable recommendations.
+""",
+    "executive_briefing": """
+Create an executive briefing document for C-level decision makers on the RFP and company profile given at the end.
+
+Include:
+1. **Strategic Opportunity Assessment** (2-3 sentences)
+2. **Business Impact Summary** (quantified benefits)
+3. **Investment Summary** (high-level costs and ROI)
+4. **Risk Assessment** (top 3 risks and mitigations)
+5. **Decision Recommendation** (Go/No-Go with rationale)
+6. **Key Success Factors** (what needs to happen to win)
+
+Keep it concise - maximum 1 page when printed.
+Use executive language focused on business value, not technical details.
+""",
+    "innovation_assessment": """
+Analyze the RFP given at the end for innovation and emerging technology opportunities.
+
+Identify:
+1. **AI/ML Integration Opportunities**: Where can AI add value?
+2. **Automation Potential**: What processes can be automated?
+3. **Data Analytics Opportunities**: What insights can be generated?
+4. **Cloud-Native Advantages**: How can cloud architecture benefit the client?
+5. **Industry 4.0 Applications**: IoT, edge computing, digital twin opportunities
+6. **Future Technology Roadmap**: 2-3 year technology evolution plan
+
+Focus on business value and competitive advantage, not just technical possibilities.
+""",
+    "rfp_breakdown": """
+You are an expert RFP analyst. Analyze the RFP document given at the end and provide a detailed breakdown.
+
+Provide a comprehensive breakdown that includes:
+1. Executive Summary - Brief overview of the RFP
+2. Key Requirements - Critical requirements listed in the RFP
+3. Evaluation Criteria - How proposals will be evaluated
+4. Timeline - Important dates and deadlines
+5. Budget Considerations - Any budget information provided
+
+Format your response in markdown.
+""",
+    "requirements": """
+You are an expert in requirement analysis. Extract and categorize all requirements from the RFP text given at the end.
+
+For each requirement:
+1. Assign a unique ID (REQ-001, REQ-002, etc.)
+2. Classify as Functional, Non-Functional, Technical, or Business
+3. Assign a priority (Critical, High, Medium, Low)
+4. Provide a clear, concise description
+
+Format your response as a markdown table with these columns:
+| ID | Type | Priority | Requirement Description |
+
+Ensure all requirements are specific, measurable, and actionable.
+""",
+    "tasks": """
+You are a project manager experienced in breaking down requirements into actionable tasks. 
+Based on the requirements given at the end, create Jira-style tasks.
+
+For each task:
+1. Assign a unique ID (TASK-001, TASK-002, etc.)
+2. Provide a short, descriptive title
+3. Write a detailed description
+4. Estimate effort (Story Points: 1, 2, 3, 5, 8, 13)
+5. Assign a task type (Development, Testing, Documentation, Design)
+6. Map to the requirement ID it fulfills
+
+Format your response as a markdown table with these columns:
+| Task ID | Title | Description | Story Points | Type | Requirement ID |
+
+Ensure tasks are specific, actionable, and can be completed in 1-3 days of work.
+""",
+}
+
+# Generation settings for prompts that do not use the model defaults
+RFP_PROMPT_CONFIGS = {
+    "executive_briefing": BRIEF_GENERATION_CONFIG,
+}
+
+# run_prompt fields holding whole documents, condensed first when oversize
+CONTEXT_FIELDS = ("rfp_text", "company_profile")
+
+# Heading each run_prompt field is given in the INPUT section of the prompt
+INPUT_LABELS = {
+    "rfp_text": "RFP TEXT",
+    "company_profile": "COMPANY PROFILE",
+    "requirements": "REQUIREMENTS",
+}
+
+
+def prompt_with_inputs(instructions, *inputs):
+    """
+    Static instructions first, then each (label, text) input. Keeping every variable part at the
+    end means all calls of one analysis share the same prompt prefix, which the provider can cache
+    """
+    parts = [instructions, "\n---\nINPUT\n"]
+    for label, text in inputs:
+        parts.append(f"\n{label}:\n{text}\n")
+    return "".join(parts)
+
+
+# Static instructions for the proposal analyses; the proposal and earlier results are appended
+# after them with prompt_with_inputs so every call of an analysis shares the same prefix
+COMPONENT_ANALYSIS_INSTRUCTIONS = """
+You are a project manager experienced in analyzing RFP (Request for Proposal) documents.
+Based on the proposal text given at the end, analyze which key RFP components are present.
+
+Format your response as a markdown table with these columns:
+| Component | Present (True/False) if true ✅ else ❌  | Details/Notes | PageNumber
+
+For each component, indicate whether it's present in the proposal and provide brief details if found.
+
+The RFP components to check for are:
+"""
+
+STANDARD_COMPONENTS = (
+    "Executive Summary / Project Overview",
+    "Scope of Work (In Scope)",
+    "Out of Scope",
+    "Prerequisites / Requirements",
+    "Deliverables",
+    "Timeline / Schedule",
+    "Technology Stack / Technical Requirements",
+    "Budget / Cost Estimation",
+    "Team Structure / Resources",
+    "Risk Assessment / Mitigation",
+    "Success Criteria / Acceptance Criteria",
+    "Testing Strategy",
+    "Maintenance & Support",
+    "Additional Comments / Notes",
+)
+
+STANDARD_COMPONENTS_LIST = "\n".join(
+    f"  {number}. {component}" for number, component in enumerate(STANDARD_COMPONENTS, 1)
+)
+
+PRICING_INSTRUCTIONS = """
+Perform a comprehensive component-wise price analysis on the proposal given at the end.
+Cross-reference pricing information from the proposal with any additional costing data provided.
+
+IMPORTANT: Only use pricing sources that are actually available, as listed under AVAILABLE PRICING SOURCES in the input. Do not calculate or reference prices from missing sources.
+
+COMPONENT-WISE PRICING ANALYSIS
+
+Based on the proposal text, AI analysis details (if available), and costing information provided, please analyze and present the pricing information in the following structured format:
+
+1. **COMPONENT SCOPE MAPPING**:
+First, extract and list all components/deliverables from the proposal and available costing data:
+- Map each component to its corresponding pricing from available sources only
+- Cross-reference pricing between proposal and available costing files
+- Identify discrepancies between different available pricing sources
+- Flag any pricing items not covered in the scope
+- Flag any scope items without clear pricing
+
+2. **PRICING SOURCES COMPARISON**:
+Create a comparison table showing pricing from available sources only, using the columns given under COMPARISON TABLE COLUMNS in the input
+
+3. **PRICING BREAKDOWN BY COMPONENT**:
+Create a detailed table for each component:
+| Component Name | Scope Description | Quantity | Unit Price | Total Price | Price Category | Source | Pricing Notes |
+
+For each component, identify:
+- Component name and detailed description
+- Quantity or units for pricing
+- Individual unit pricing from available sources only
+- Total cost for that component
+- Category (Labor, Materials, Software, Hardware, Services, etc.)
+- Primary pricing source (from available sources)
+- Any special pricing conditions or notes
+
+4. **LABOR COMPONENT ANALYSIS**:
+- Break down by role/skill level
+- Hourly rates for each position from available sources only
+- Total hours allocated per role
+- Compare rates across available sources and with market standards
+- Identify rate discrepancies between available sources
+- Recommend optimal labor pricing structure
+
+5. **DELIVERABLE COMPONENT ANALYSIS**:
+For each deliverable:
+- Deliverable name and comprehensive description
+- Associated costs from available sources only
+- Pricing structure comparison
+- Timeline impact on pricing
+- Quality/complexity factors affecting price
+- Recommended pricing based on source analysis
+
+6. **SERVICE COMPONENT ANALYSIS**:
+- Professional services breakdown by available sources
+- Implementation and deployment costs comparison from available sources
+- Training costs per component across available sources
+- Support and maintenance pricing variations from available sources
+- Service level agreements and warranty cost differences from available sources
+- Recommended service pricing structure
+
+7. **TECHNOLOGY COMPONENT ANALYSIS**:
+- Software licenses and costs from available sources
+- Hardware requirements and pricing variations from available sources
+- Integration costs between components from available sources
+- Maintenance and support cost comparisons from available sources
+- Technology vendor pricing discrepancies from available sources
+
+8. **COMPONENT COST RANKING**:
+- Rank all components by total cost (highest to lowest) based on available pricing
+- Show percentage of total cost for each component based on available pricing
+- Identify top 5 most expensive components based on available pricing
+- Cost distribution analysis across available sources
+- Price sensitivity analysis for major components based on available pricing
+
+9. **PRICING CONSISTENCY ANALYSIS**:
+- Identify discrepancies between proposal and available costing data
+- Flag significant price variations (>10% difference) between available sources
+- Assess pricing methodology consistency across available sources
+- Recommend pricing reconciliation actions based on available data
+- Highlight potential pricing errors or omissions in available sources
+
+10. **COMPONENT-SPECIFIC RECOMMENDATIONS**:
+For each major component:
+- Pricing reasonableness assessment based on available sources
+- Value proposition evaluation based on available pricing
+- Risk factors and pricing contingencies based on available data
+- Negotiation points and alternatives based on available pricing
+- Cost optimization opportunities based on available sources
+- Recommended final pricing with justification based on available data
+
+11. **PRICING OPTIMIZATION OPPORTUNITIES**:
+- Bundle vs individual component pricing analysis based on available data
+- Volume discount opportunities based on available pricing
+- Alternative sourcing recommendations based on available data
+- Timeline-based pricing optimizations based on available information
+- Risk mitigation pricing strategies based on available sources
+
+12. **FINAL PRICING RECOMMENDATIONS**:
+- Consolidated pricing table with recommended prices based on available sources
+- Total project cost summary based on available pricing data
+- Pricing rationale and source justification based on available information
+- Implementation recommendations based on available data
+- Contingency and risk pricing suggestions based on available sources
+
+CRITICAL INSTRUCTION: Only reference and calculate prices from sources that are actually provided.
+If a pricing source is missing, do not include it in calculations or comparisons.
+If only proposal pricing is available, focus analysis on that single source.
+
+Format the response in clear markdown with tables where appropriate.
+Ensure all analysis leverages information from available sources only.
+Provide specific, actionable insights for each component with clear source attribution.
+Highlight any critical pricing issues that require immediate attention.
+"""
+
+COST_REALISM_INSTRUCTIONS = """
+Perform a comprehensive cost realism analysis on the government contract proposal given at the end
+per FAR 15.404-1(d). Evaluate whether the proposed costs are realistic for the work to be performed.
+
+---
+COST REALISM ANALYSIS REQUIREMENTS:
+
+1. LABOR COST REALISM:
+- Analyze proposed labor categories and skill levels
+- Evaluate if labor hours are realistic for proposed tasks
+- Compare labor rates with market standards and locality pay
+- Assess if proposed labor mix matches technical requirements
+- Flag any unusually high or low labor estimates
+
+2. MATERIAL COST REALISM:
+- Evaluate material quantities vs. work scope
+- Assess material specifications and quality requirements
+- Compare material costs with market prices
+- Check for appropriate material waste/shrinkage factors
+- Identify any missing or under-estimated materials
+
+3. SUBCONTRACTOR COST REALISM:
+- Analyze subcontractor selection and pricing
+- Evaluate if subcontractor capabilities match requirements
+- Assess prime contractor oversight and management costs
+- Check for appropriate subcontractor profit margins
+
+4. OVERHEAD AND INDIRECT COST ANALYSIS:
+- Evaluate overhead rates for reasonableness
+- Assess G&A expenses and allocation methods
+- Review facilities costs and utilization rates
+- Analyze other direct costs (ODCs) for appropriateness
+
+5. SCHEDULE REALISM vs. COST:
+- Evaluate if proposed timeline is achievable with proposed resources
+- Assess potential for schedule compression costs
+- Identify resource conflicts or unrealistic assumptions
+- Check for adequate contingency in schedule and cost
+
+6. TECHNICAL APPROACH vs. COST ALIGNMENT:
+- Verify costs support proposed technical solution
+- Identify any disconnects between approach and resources
+- Assess if proposed team size matches work complexity
+- Evaluate innovation/risk vs. cost trade-offs
+
+---
+RISK ASSESSMENT:
+
+1. PERFORMANCE RISK:
+- Identify areas where low costs may impact performance
+- Assess contractor's ability to deliver with proposed resources
+- Evaluate potential for cost growth during performance
+
+2. SCHEDULE RISK:
+- Analyze if costs support schedule commitments
+- Identify resource-constrained critical path items
+- Assess potential for schedule slippage due to underestimating
+
+3. COST GROWTH RISK:
+- Identify line items most likely to experience overruns
+- Evaluate adequacy of management reserve/contingency
+- Assess historical contractor performance on similar efforts
+
+---
+FINAL COST REALISM DETERMINATION:
+Provide:
+- Overall cost realism assessment (Realistic/Unrealistic/Questionable)
+- Specific areas of concern requiring clarification
+- Recommended adjustments to most probable cost
+- Risk mitigation strategies for identified concerns
+- Suggested areas for negotiation or contractor clarification
+
+Format your response with clear sections and specific findings.
+"""
+
+TECHNICAL_ANALYSIS_INSTRUCTIONS = """
+Conduct a thorough technical analysis of the proposal given at the end to evaluate the contractor's
+technical approach, capability, and likelihood of successful performance.
+
+---
+TECHNICAL ANALYSIS FRAMEWORK:
+
+1. TECHNICAL APPROACH EVALUATION:
+- Assess comprehensiveness of proposed solution
+- Evaluate innovation and state-of-the-art considerations
+- Analyze methodology and work breakdown structure
+- Review integration of all technical requirements
+- Identify any gaps or weaknesses in approach
+
+2. TECHNICAL FEASIBILITY ASSESSMENT:
+- Evaluate realistic achievability of proposed solution
+- Assess technical risks and mitigation strategies
+- Review compliance with technical specifications
+- Analyze performance requirements vs. proposed capabilities
+- Identify potential technical challenges
+
+3. PAST PERFORMANCE CORRELATION:
+- Assess relevance of cited past performance
+- Evaluate scale and complexity comparisons
+- Review lessons learned integration
+- Analyze team continuity from past efforts
+- Assess risk based on performance history
+
+4. PERSONNEL AND QUALIFICATIONS:
+- Evaluate key personnel qualifications vs. requirements
+- Assess team composition and skill mix
+- Review organizational structure and reporting
+- Analyze staffing plan adequacy
+- Identify potential resource constraints
+
+5. FACILITIES AND EQUIPMENT:
+- Assess facility adequacy for proposed work
+- Evaluate equipment capabilities and availability
+- Review security clearance and facility requirements
+- Analyze geographic distribution if applicable
+- Assess infrastructure support capabilities
+
+6. SUBCONTRACTOR INTEGRATION:
+- Evaluate subcontractor technical capabilities
+- Assess prime contractor management approach
+- Review work allocation and integration plans
+- Analyze communication and coordination methods
+- Assess overall team cohesion
+
+---
+RISK ANALYSIS:
+
+1. TECHNICAL PERFORMANCE RISKS:
+- Identify high-risk technical areas
+- Assess probability and impact of technical failures
+- Evaluate backup plans and alternatives
+- Review testing and validation approaches
+
+2. SCHEDULE RISKS:
+- Analyze critical path technical dependencies
+- Assess resource loading and availability
+- Evaluate parallel vs. sequential work planning
+- Identify potential schedule compression impacts
+
+3. INTEGRATION RISKS:
+- Assess system integration complexity
+- Evaluate interface management approach
+- Review compatibility with existing systems
+- Analyze interoperability requirements
+
+---
+COMPLIANCE VERIFICATION:
+- Verify compliance with all technical requirements
+- Identify any deviations or exceptions
+- Assess impact of proposed alternatives
+- Review regulatory and standard compliance
+
+---
+FINAL TECHNICAL ASSESSMENT:
+Provide:
+- Overall technical rating (Excellent/Good/Satisfactory/Marginal/Unsatisfactory)
+- Key technical strengths and innovations
+- Critical technical weaknesses or gaps
+- Recommended areas for clarification
+- Risk mitigation recommendations
+- Technical evaluation summary for source selection
+
+Structure your response with clear headings and specific technical findings.
+"""
+
+COMPLIANCE_INSTRUCTIONS = """
+Perform a detailed compliance assessment of the proposal given at the end to determine adherence
+to RFP requirements and identify any non-compliant areas.
+
+---
+COMPLIANCE ASSESSMENT AREAS:
+
+1. PROPOSAL FORMAT AND SUBMISSION REQUIREMENTS:
+- Verify adherence to page limits and formatting
+- Check required sections and content organization
+- Assess completeness of required submissions
+- Review compliance with submission instructions
+- Identify any missing required documents
+
+2. TECHNICAL REQUIREMENTS COMPLIANCE:
+- Verify compliance with all technical specifications
+- Check adherence to performance requirements
+- Assess compliance with quality standards
+- Review regulatory and code compliance
+- Identify any technical requirement gaps
+
+3. CONTRACTUAL TERMS AND CONDITIONS:
+- Assess acceptance of standard contract terms
+- Review any proposed exceptions or deviations
+- Evaluate compliance with special contract requirements
+- Check adherence to delivery and performance terms
+- Assess warranty and support commitments
+
+4. CERTIFICATION AND REGISTRATION REQUIREMENTS:
+- Verify required business registrations (SAM, CAGE)
+- Check industry-specific certifications
+- Assess personnel certification requirements
+- Review facility accreditation needs
+- Verify small business representations
+
+5. SECURITY AND CLEARANCE REQUIREMENTS:
+- Assess facility security clearance (FSC) compliance
+- Verify personnel security clearance requirements
+- Review information security protocols
+- Check ITAR/EAR compliance if applicable
+- Assess cybersecurity requirements adherence
+
+6. ADMINISTRATIVE REQUIREMENTS:
+- Verify cost/price proposal format compliance
+- Check required cost breakdowns and supporting data
+- Assess audit trail and cost traceability
+- Review required representations and certifications
+- Verify proper signature authorities
+
+---
+SOCIOECONOMIC COMPLIANCE:
+
+1. Small Business Requirements:
+- Verify small business size standard compliance
+- Check subcontracting plan requirements
+- Assess HUBZone, SDVOSB, WOSB compliance
+- Review mentor-protégé arrangements
+- Evaluate small business participation goals
+
+2. Equal Opportunity Compliance:
+- Assess EEO compliance statements
+- Review affirmative action commitments
+- Check VEVRAA compliance
+- Evaluate Section 503 compliance
+- Assess diversity and inclusion commitments
+
+---
+ENVIRONMENTAL AND SAFETY COMPLIANCE:
+- Verify environmental regulation compliance
+- Assess workplace safety requirements
+- Check hazardous material handling protocols
+- Review waste disposal and recycling plans
+- Evaluate sustainability requirements
+
+---
+DATA MANAGEMENT AND INTELLECTUAL PROPERTY:
+- Assess data delivery requirements compliance
+- Review intellectual property rights handling
+- Check data rights and licensing terms
+- Evaluate information handling protocols
+- Assess government access requirements
+
+---
+COMPLIANCE RISK ASSESSMENT:
+- Identify critical compliance gaps
+- Assess risk of non-compliance impacts
+- Evaluate potential for cure/correction
+- Assess past compliance performance
+- Review compliance management systems
+
+---
+FINAL COMPLIANCE DETERMINATION:
+Provide:
+- Overall compliance rating (Compliant/Conditionally Compliant/Non-Compliant)
+- List of all compliance gaps or concerns
+- Critical vs. minor compliance issues
+- Recommended actions for compliance resolution
+- Areas requiring clarification or correction
+- Compliance risk assessment for contract award
+
+Format response with clear compliance status for each major area.
+"""
+
+SUMMARY_INSTRUCTIONS = """
+As a senior government contracts specialist, generate a comprehensive 2-3 page executive summary
+that synthesizes all analyses of the proposal given at the end. The summary should provide clear, actionable
+insights for procurement decision-makers.
+
+# REQUIRED OUTPUT STRUCTURE
+
+## 1. EXECUTIVE OVERVIEW
+- High-level proposal assessment (completeness, quality, competitiveness)
+- Key statistics (page count, sections completed, compliance rate)
+- Overall recommendation (Approve/Conditional Approval/Reject)
+- Summary of most significant findings
+
+## 2. COMPONENT ANALYSIS SUMMARY
+- Table of critical components with status indicators:
+| Component | Status (✅/❌) | Notes | Page Number |
+|-----------|--------------|-------|----------------|
+[Include all major components from analysis]
+- Missing or incomplete elements
+- Quality assessment of provided components
+
+## 3. EVALUATION MATRIX
+Create a quick-reference table summarizing all evaluation factors:
+| Factor | Rating (1-5) | Strengths | Concerns |
+|--------|-------------|-----------|----------|
+| Technical Approach | | | |
+| Price/Cost | | | |
+| Compliance | | | |
+| Risk | | | |
+| Past Performance | | | |
+
+## 4. DETAILED ASSESSMENT SECTIONS
+
+**A. Technical Evaluation**
+- Approach adequacy and innovation
+- Team qualifications
+- Technical risks and mitigation
+
+**B. Price/Cost Analysis**
+- Price competitiveness
+- Cost realism findings
+- Value proposition
+- Budget alignment
+
+**C. Compliance Status**
+- Mandatory requirements met/missing
+- Conditional compliance items
+- Documentation completeness
+
+## 5. RISK ASSESSMENT
+- Performance risk (High/Medium/Low)
+- Cost growth potential
+- Schedule risks
+- Technical implementation risks
+- Overall risk rating with justification
+
+## 6. STRENGTHS & WEAKNESSES
+- Top 3 proposal strengths
+- Top 3 critical weaknesses
+- Competitive advantages
+- Areas requiring clarification
+
+## 7. RECOMMENDATIONS & NEXT STEPS
+- Award recommendation
+- Required negotiations or clarifications
+- Suggested contract type
+- Special conditions if applicable
+- Timeline for resolution if conditional
+
+# FORMATTING REQUIREMENTS
+- Use professional government contracting terminology
+- Include specific examples and page references
+- Highlight critical decision points
+- Balance conciseness with comprehensive coverage
+- Use markdown formatting with clear headings
+- Include quantitative metrics where available
+
+Generate approximately 1500-2000 words of detailed analysis suitable for senior leadership review.
+"""
+
+
+def cost_realism_inputs(proposal_text, ai_analysis_details):
+    """Inputs of the cost realism prompt"""
+    return (("PROPOSAL TEXT", proposal_text), ("AI ANALYSIS DETAILS", ai_analysis_details))
+
+
+def summary_inputs(proposal_text, ai_analysis_details, price_analysis=None, cost_realism=None,
+                   technical_analysis=None, compliance_assessment=None):
+    """Inputs of the executive summary prompt; analyses that were not run are marked as such"""
+    return (
+        ("PROPOSAL CONTENT", proposal_text),
+        ("AI COMPONENT ANALYSIS", ai_analysis_details),
+        ("PRICE ANALYSIS", price_analysis or "Not performed"),
+        ("COST REALISM ASSESSMENT", cost_realism or "Not performed"),
+        ("TECHNICAL EVALUATION", technical_analysis or "Not performed"),
+        ("COMPLIANCE VERIFICATION", compliance_assessment or "Not performed"),
+    )
+
+ALL_IN_ONE_INSTRUCTIONS = """
+As a senior government contracts specialist, evaluate the proposal given at the end in one pass.
+
+Produce five analyses, each written in clear markdown with tables where appropriate:
+- price: component-wise price analysis using only pricing stated in the proposal
+- cost_realism: whether proposed costs are realistic for the scope (FAR 15.404-1(d))
+- technical: technical approach, feasibility, team and technical risks
+- compliance: compliance with stated requirements and regulations
+- summary: an executive summary of the above with an overall recommendation
+  (Approve/Conditional Approval/Reject) suitable for senior leadership
+
+Keep each analysis under about 1000 words so that all five fit in one response.
+
+Respond with ONLY a JSON object with exactly the keys
+"price", "cost_realism", "technical", "compliance" and "summary",
+each mapped to its markdown analysis as a string. Do not wrap the JSON in code fences.
+"""
+
+# Keys analyze_all_in_one must return, and the output budget the five analyses share
+ALL_IN_ONE_KEYS = ("price", "cost_realism", "technical", "compliance", "summary")
+ALL_IN_ONE_GENERATION_CONFIG = genai.types.GenerationConfig(
+    max_output_tokens=8192,
+    candidate_count=1,
+)
+
+
+# Born-digital PDFs carry far more text than this per page; scanned ones carry next to none
+MIN_TEXT_CHARS_PER_PAGE = 200
+PDF_HANDLING_MODES = ("auto", "text", "vision")
+
+
+def read_file_bytes(path):
+    """Whole file contents; called through asyncio.to_thread so the event loop never waits on disk"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def extract_pdf_text_locally(pdf_bytes, page_numbers=False):
+    """
+    Read the embedded text layer of a PDF without calling Gemini
+    Returns the text and the average number of characters found per page
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages, total_chars = [], 0
+    for number, page in enumerate(reader.pages, 1):
+        text = (page.extract_text() or "").strip()
+        total_chars += len(text)
+        pages.append(f"[Page {number}]\n{text}" if page_numbers else text)
+    return "\n\n".join(pages), total_chars / max(len(pages), 1)
+
+
+def extract_docx_text_locally(docx_bytes):
+    """Paragraph and table text of a DOCX in document order, read with python-docx"""
+    document = Document(io.BytesIO(docx_bytes))
+    blocks = []
+    for element in document.element.body.iterchildren():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            text = Paragraph(element, document).text.strip()
+            if text:
+                blocks.append(text)
+        elif tag == "tbl":
+            for row in Table(element, document).rows:
+                blocks.append(" | ".join(cell.text.strip() for cell in row.cells))
+    return "\n".join(blocks)
+
+
+# Image types Gemini accepts inline; vector formats such as EMF are skipped
+GEMINI_IMAGE_TYPES = ("image/png", "image/jpeg", "image/webp", "image/heic", "image/heif")
+
+
+def docx_images(docx_bytes):
+    """Embedded images of a DOCX as Gemini inline parts, for documents that are only scans"""
+    package = Document(io.BytesIO(docx_bytes)).part.package
+    return [
+        {"mime_type": part.content_type, "data": part.blob}
+        for part in package.iter_parts()
+        if part.content_type in GEMINI_IMAGE_TYPES
+    ]
+
+
+DOCX_IMAGE_EXTRACTION_PROMPT = """
+Please extract all text content from these scanned document images, in order.
+Return only the extracted text without any additional formatting or commentary.
+Preserve the structure and organization of the content as much as possible.
+"""
+
+
+# Scanned PDFs are sent to Gemini PDF_PAGES_PER_REQUEST pages per request, this many requests at a time
+PDF_PAGE_BATCH_SIZE = 10
+PDF_PAGES_PER_REQUEST = 5
+
+# Text extracted from each group of scanned pages is kept on disk, keyed on the page bytes,
+# so re-uploading a document (or one with a single page changed) skips the pages already read
+PDF_PAGE_CACHE_DIR = os.getenv("PDF_PAGE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".page_cache"))
+
+PAGE_EXTRACTION_PROMPT = """
+Please extract all text content from this PDF, which holds pages {first} to {last} of a larger document.
+Start the text of each page with a line "[Page N]", numbering the first page of this PDF as {first}.
+Return only the extracted text without any additional formatting or commentary.
+Preserve the structure and organization of the content as much as possible.
+"""
+
+
+def page_cache_path(part, prompt):
+    """Cache file for the text of one group of pages extracted with this prompt"""
+    digest = hashlib.sha256(part)
+    digest.update(prompt.encode("utf-8"))
+    return os.path.join(PDF_PAGE_CACHE_DIR, f"{digest.hexdigest()}.txt")
+
+
+def read_cached_page_text(path):
+    """Cached page text, or None when there is none or it cannot be read"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_cached_page_text(path, text):
+    """Store page text; a failed write only costs a future cache miss"""
+    try:
+        os.makedirs(PDF_PAGE_CACHE_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def split_pdf_pages(pdf_bytes, pages_per_part=1):
+    """
+    Split a PDF into PDFs of at most pages_per_part consecutive pages, in page order
+    Returns the parts and the page count of the whole PDF
+    """
+    pages = PdfReader(io.BytesIO(pdf_bytes)).pages
+    parts = []
+    for start in range(0, len(pages), pages_per_part):
+        writer = PdfWriter()
+        for page in pages[start:start + pages_per_part]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        parts.append(buffer.getvalue())
+    return parts, len(pages)
+
+
+# Lighter model for extraction-style tasks; tasks not listed here use the client's own model
+FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-2.0-flash-lite")
+MODEL_ROUTING = {
+    "pdf_pages": FAST_MODEL,
+    "context_condense": FAST_MODEL,
+    "component_analysis": FAST_MODEL,
+    "technical_analysis": FAST_MODEL,
+    "compliance_assessment": FAST_MODEL,
+}
+
+# Free-tier gemini-2.0-flash allows 15 requests per minute; stay just under it by default
+REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "14"))
+
+# Requests in flight at once per client, on top of the per-minute limit
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+
+# Quota and availability errors are retried with exponential backoff
+RETRYABLE_ERRORS = (ResourceExhausted, ServiceUnavailable, DeadlineExceeded)
+MAX_ATTEMPTS = 6
+INITIAL_BACKOFF = 2
+MAX_BACKOFF = 60
+
+# Seconds to wait for a response (for a stream, its first chunk) before abandoning the call and
+# trying again; each retry waits 1.5x longer, and a call that times out TIMEOUT_ATTEMPTS times fails
+REQUEST_TIMEOUT = float(os.getenv("GEMINI_REQUEST_TIMEOUT", "120"))
+TIMEOUT_ATTEMPTS = 3
+
+
+class RateLimiter:
+    """Sliding-window limiter allowing at most `rate` acquisitions per `period` seconds"""
+
+    def __init__(self, rate, period=60.0):
+        self.rate = rate
+        self.period = period
+        self._calls = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._calls[0]))
+
+
+# Number of model responses kept in memory per client, keyed on the exact prompt, and for how long
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 3600
+
+# When set (e.g. 0.92), an analysis whose inputs embed at least this close to an earlier run of the
+# same analysis reuses that response. Off by default: near-identical proposals can differ in the
+# figures an analysis is meant to check
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD") or 0) or None
+# Analyses whose result depends on exact figures are never served from a merely similar input
+EXACT_MATCH_ONLY = frozenset((PRICING_INSTRUCTIONS, COST_REALISM_INSTRUCTIONS))
+EMBEDDING_MODEL = "models/embedding-001"
+# Longer inputs are embedded in pieces of this size, within the embedding model's input limit,
+# and the pieces' embeddings averaged
+EMBEDDING_INPUT_CHARS = 8000
+
+
+def content_key(*parts):
+    """BLAKE2b digest identifying a combination of text inputs"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def static_key(text):
+    """content_key of a module-level prompt constant, hashed once per process"""
+    return content_key(text)
+
+
+def analysis_keys(instructions, inputs, kwargs):
+    """(namespace, key) of an analysis: the namespace covers instructions and settings, the key adds the inputs"""
+    namespace = content_key(static_key(instructions), repr(sorted(kwargs.items())))
+    return namespace, content_key(namespace, *(part for labelled in inputs for part in labelled))
+
+
+# RFP, profile and proposal text longer than this is condensed once before it goes into the analysis prompts
+MAX_CONTEXT_CHARS = 120_000
+CONTEXT_CHUNK_CHARS = 40_000
+CONDENSED_CONTEXT_CACHE_SIZE = 32
+
+CONTEXT_CONDENSE_PROMPT = """
+Condense the following excerpt of a larger document to at most {budget} characters.
+Keep every requirement, deadline, evaluation criterion, budget or cost figure, labor category, quantity and named entity verbatim.
+Drop boilerplate, repetition and formatting. Return only the condensed text.
+
+Excerpt:
+{chunk}
+"""
+
+
+def split_text(text, size):
+    """Split text into pieces of at most `size` characters, preferring paragraph and line breaks"""
+    pieces = []
+    start = 0
+    while len(text) - start > size:
+        end = start + size
+        cut = text.rfind("\n\n", start, end)
+        if cut <= start:
+            cut = text.rfind("\n", start, end)
+        if cut <= start:
+            cut = end
+        pieces.append(text[start:cut])
+        start = cut
+    pieces.append(text[start:])
+    return pieces
+
+
 class GeminiClient:
-    def __init__(self, model_name="gemini-2.0-flash"):
-        """Initialize the Gemini client with the specified model"""
-        self.model = genai.GenerativeModel(model_name)
-        self.vision_model = genai.GenerativeModel('gemini-2.0-flash')
+    def __init__(self, model_name="gemini-2.0-flash", pdf_handling="auto"):
+        """
+        Initialize the Gemini client with the specified model
+        pdf_handling: "auto" reads a PDF's text layer locally and only sends scanned PDFs to Gemini,
+        "text" always reads locally, "vision" always sends the PDF to Gemini
+        """
+        if pdf_handling not in PDF_HANDLING_MODES:
+            raise ValueError(f"pdf_handling must be one of {PDF_HANDLING_MODES}")
+        self.model = get_model(model_name)
+        self._task_models = {task: get_model(name) for task, name in MODEL_ROUTING.items()}
+        self.pdf_handling = pdf_handling
+        self._response_cache = LLMCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+        self._condensed_contexts = OrderedDict()
+        self._pending_responses = {}
+        self._pending_streams = {}
+        self._limiter = RateLimiter(REQUESTS_PER_MINUTE)
+        self._in_flight = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def _generate(self, contents, task=None, **kwargs):
+        """
+        Every model call goes through here: at most MAX_CONCURRENT_REQUESTS in flight,
+        rate limited across the client and retried with exponential backoff on quota
+        and availability errors. A streamed call holds its slot until the first chunk arrives.
+        A call stuck past REQUEST_TIMEOUT is retried with a longer timeout.
+        `task` picks the model from MODEL_ROUTING, defaulting to the client's model.
+        """
+        model = self._task_models.get(task, self.model)
+        delay = INITIAL_BACKOFF
+        timeout, timeouts = REQUEST_TIMEOUT, 0
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                async with self._in_flight:
+                    await self._limiter.acquire()
+                    return await asyncio.wait_for(model.generate_content_async(contents, **kwargs), timeout)
+            except asyncio.TimeoutError:
+                timeouts += 1
+                if timeouts == TIMEOUT_ATTEMPTS or attempt == MAX_ATTEMPTS:
+                    raise
+                timeout *= 1.5
+            except RETRYABLE_ERRORS:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                await asyncio.sleep(delay + random.uniform(0, 1))
+                delay = min(delay * 2, MAX_BACKOFF)
+
+    async def _extract_pdf_pages(self, pdf_bytes):
+        """
+        Extract a PDF through Gemini PDF_PAGES_PER_REQUEST pages per request, PDF_PAGE_BATCH_SIZE requests concurrently
+        Returns None when the PDF cannot be split or has a single page
+        """
+        try:
+            parts, page_count = await asyncio.to_thread(split_pdf_pages, pdf_bytes, PDF_PAGES_PER_REQUEST)
+        except Exception:
+            return None
+        if page_count < 2:
+            return None
+
+        async def extract_part(index, part):
+            first = index * PDF_PAGES_PER_REQUEST + 1
+            last = min(first + PDF_PAGES_PER_REQUEST - 1, page_count)
+            prompt = PAGE_EXTRACTION_PROMPT.format(first=first, last=last)
+            cache_path = page_cache_path(part, prompt)
+            text = await asyncio.to_thread(read_cached_page_text, cache_path)
+            if text is not None:
+                return text
+            response = await self._generate([prompt, {"mime_type": "application/pdf", "data": part}], task="pdf_pages")
+            await asyncio.to_thread(write_cached_page_text, cache_path, response.text)
+            return response.text
 
-    
-    async def extract_text_from_docx(self, docx_file):
+        texts = []
+        for start in range(0, len(parts), PDF_PAGE_BATCH_SIZE):
+            texts.extend(await asyncio.gather(*(
+                extract_part(index, parts[index])
+                for index in range(start, min(start + PDF_PAGE_BATCH_SIZE, len(parts)))
+            )))
+        return "\n\n".join(texts)
+
+    async def _local_pdf_text(self, pdf_bytes, page_numbers=False):
         """
-        Convert DOCX to PDF and then extract text using Gemini
+        Text of the PDF read locally, or None when Gemini should read it instead
+        Parsing runs in a worker thread so a large PDF does not hold up the event loop
         """
+        if self.pdf_handling == "vision":
+            return None
+        if self.pdf_handling == "text":
+            return (await asyncio.to_thread(extract_pdf_text_locally, pdf_bytes, page_numbers))[0]
         try:
-            # Create temporary directory for file processing
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Save uploaded DOCX file temporarily
-                docx_path = os.path.join(temp_dir, "document.docx")
-                docx_content = await docx_file.read()
-                with open(docx_path, "wb") as f:
-                    f.write(docx_content)
-                await docx_file.seek(0)  # Reset file pointer
-                
-                # Convert DOCX to PDF
-                pdf_path = os.path.join(temp_dir, "document.pdf")
-                convert(docx_path, pdf_path)
-                
-                # Extract text from PDF using Gemini
-                return await self.extract_text_from_pdf_file(pdf_path)
-                
-        except Exception as e:
-            raise Exception(f"Error processing DOCX file: {str(e)}")
+            text, chars_per_page = await asyncio.to_thread(extract_pdf_text_locally, pdf_bytes, page_numbers)
+        except Exception:
+            return None
+        return text if chars_per_page >= MIN_TEXT_CHARS_PER_PAGE else None
+
+    def _cached_response(self, key):
+        """Return a previously generated response for this key, if any"""
+        return self._response_cache.get(key)
+
+    def _remember_response(self, key, text):
+        """Keep a generated response, evicting the least recently used one when full"""
+        self._response_cache.put(key, text)
+
+    async def _generate_text(self, prompt, **kwargs):
+        """Text of the model's response to a text prompt, reused for an identical prompt and config"""
+        key = content_key(prompt, repr(sorted(kwargs.items())))
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        async def generate():
+            response = await self._generate(prompt, **kwargs)
+            self._remember_response(key, response.text)
+            return response.text
 
-    async def extract_text_from_pdf_file(self, pdf_path):
+        return await self._single_flight(key, generate)
+
+    async def _single_flight(self, key, generate):
+        """
+        Result of generate(), shared with any identical call still in flight, so a repeated click
+        or concurrent duplicate request waits for the first model call instead of making its own.
+        A caller that is cancelled does not cancel the call for the others.
         """
-        Extract text from PDF file using Gemini's multimodal capabilities
+        task = self._pending_responses.get(key)
+        if task is None:
+            task = asyncio.ensure_future(generate())
+            self._pending_responses[key] = task
+            task.add_done_callback(lambda _: self._pending_responses.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _embed_text(self, text):
+        """Unit embedding of the whole text, averaged over its EMBEDDING_INPUT_CHARS pieces"""
+        results = await asyncio.gather(*(
+            asyncio.to_thread(genai.embed_content, model=EMBEDDING_MODEL, content=piece)
+            for piece in split_text(text, EMBEDDING_INPUT_CHARS)
+        ))
+        vectors = [result["embedding"] for result in results]
+        return unit_vector([sum(values) / len(vectors) for values in zip(*vectors)])
+
+    async def _embed_inputs(self, inputs):
         """
+        Embedding of every input, each embedded separately and the unit vectors concatenated,
+        so the similarity of two such embeddings is the mean similarity of their inputs
+        None when an input is empty or an embedding call fails
+        """
+        texts = [text for _, text in inputs]
+        if not all(texts):
+            return None
         try:
-            # Upload file to Gemini
-            with open(pdf_path, 'rb') as f:
-                pdf_bytes = f.read()
-            
-            # Extract text using Gemini
-            prompt = """
-            Please extract all text content from this PDF document.
-            Return only the extracted text without any additional formatting or commentary.
-            Preserve the structure and organization of the content as much as possible.
-            """
-            
-            # Remove await here - generate_content is synchronous
-            response = self.model.generate_content([
-                prompt,
-                {'mime_type': 'application/pdf', 'data': pdf_bytes}
-            ])
-            
+            vectors = await asyncio.gather(*(self._embed_text(text) for text in texts))
+        except Exception:
+            return None
+        if None in vectors:
+            return None
+        return [x for vector in vectors for x in vector]
+
+    async def _generate_analysis(self, instructions, *inputs, **kwargs):
+        """
+        Response to prompt_with_inputs(instructions, *inputs): reused for identical inputs and,
+        with SEMANTIC_CACHE_THRESHOLD set, for inputs similar to an earlier run of the same instructions
+        unless those are in EXACT_MATCH_ONLY
+        The key hashes only the inputs plus the instructions' precomputed digest, and the full
+        prompt is only assembled when the model is actually called
+        """
+        namespace, key = analysis_keys(instructions, inputs, kwargs)
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        async def generate():
+            embedding = None
+            if SEMANTIC_CACHE_THRESHOLD is not None and instructions not in EXACT_MATCH_ONLY:
+                embedding = await self._embed_inputs(inputs)
+                if embedding is not None:
+                    similar = self._response_cache.nearest(namespace, embedding, SEMANTIC_CACHE_THRESHOLD)
+                    if similar is not None:
+                        return similar
+
+            response = await self._generate(prompt_with_inputs(instructions, *inputs), **kwargs)
+            self._response_cache.put(key, response.text, namespace, embedding)
             return response.text
-            
-        except Exception as e:
-            raise Exception(f"Error extracting text from PDF: {str(e)}")
 
-    async def extract_text_from_uploaded_pdf(self, pdf_file):
+        return await self._single_flight(key, generate)
+
+    async def _stream_analysis(self, instructions, *inputs, **kwargs):
         """
-        Extract text from uploaded PDF file using Gemini
+        Same response as _generate_analysis, yielded chunk by chunk as the model produces it
+        Shares its exact-match cache; a cached response comes back as one chunk
         """
+        namespace, key = analysis_keys(instructions, inputs, kwargs)
+        async for chunk in self._stream(prompt_with_inputs(instructions, *inputs), key, namespace, **kwargs):
+            yield chunk
+
+    async def _prepare_context(self, text, max_chars=MAX_CONTEXT_CHARS):
+        """
+        Text to place in an analysis prompt: unchanged when it fits in max_chars, otherwise
+        condensed once and shared by every analysis of the same document, including concurrent ones
+        """
+        if not text or len(text) <= max_chars:
+            return text
+        key = content_key(text, str(max_chars))
+        task = self._condensed_contexts.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._condense(text, max_chars))
+            self._condensed_contexts[key] = task
+            if len(self._condensed_contexts) > CONDENSED_CONTEXT_CACHE_SIZE:
+                self._condensed_contexts.popitem(last=False)
         try:
-            # Create temporary file for PDF processing
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                pdf_content = await pdf_file.read()
-                temp_file.write(pdf_content)
-                temp_file_path = temp_file.name
-                await pdf_file.seek(0)  # Reset file pointer
-            
-            try:
-                # Extract text using Gemini
-                text = await self.extract_text_from_pdf_file(temp_file_path)
-                return text
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
-                
-        except Exception as e:
-            raise Exception(f"Error processing uploaded PDF: {str(e)}")
-      
-    async def analyze_eligibility(self, rfp_text, company_profile):
+            return await task
+        except Exception:
+            self._condensed_contexts.pop(key, None)
+            raise
+
+    async def _condense(self, text, max_chars):
+        """Map-reduce summarization: condense chunks concurrently, recurse until the result fits"""
+        chunks = split_text(text, CONTEXT_CHUNK_CHARS)
+        budget = max_chars // len(chunks)
+        summaries = await asyncio.gather(*(
+            self._generate_text(CONTEXT_CONDENSE_PROMPT.format(budget=budget, chunk=chunk), task="context_condense")
+            for chunk in chunks
+        ))
+        condensed = "\n\n".join(summaries)
+        if len(condensed) > max_chars and len(condensed) < len(text):
+            return await self._condense(condensed, max_chars)
+        return condensed[:max_chars]
+
+    async def run_prompt(self, key, **fields):
+        """Run one of RFP_PROMPTS on the given inputs and return the model's response, condensing oversize documents first"""
+        for name in CONTEXT_FIELDS:
+            if name in fields:
+                fields[name] = await self._prepare_context(fields[name])
+        inputs = [(INPUT_LABELS[name], value) for name, value in fields.items()]
+        config = RFP_PROMPT_CONFIGS.get(key)
+        if config is None:
+            return await self._generate_analysis(RFP_PROMPTS[key], *inputs)
+        return await self._generate_analysis(RFP_PROMPTS[key], *inputs, generation_config=config)
+
+    
+    async def _docx_text(self, docx_bytes):
+        """Text of a DOCX read locally; only a DOCX with no text but embedded images goes to Gemini"""
+        text = await asyncio.to_thread(extract_docx_text_locally, docx_bytes)
+        if text:
+            return text
+        images = await asyncio.to_thread(docx_images, docx_bytes)
+        if not images:
+            return text
+        response = await self._generate([DOCX_IMAGE_EXTRACTION_PROMPT, *images])
+        return response.text
+
+    async def extract_text_from_docx(self, docx_file):
         """
-        Analyze if the company meets the eligibility requirements in the RFP
+        Extract text from a DOCX file locally with python-docx
         """
-        prompt = f"""
-        You are an experienced bid manager specializing in evaluating RFP eligibility. 
-        Based on the following RFP document and company profile, analyze whether the company meets the basic eligibility requirements to respond to this RFP.
-        
-        RFP Text:
-        {rfp_text}
-        
-        Company Profile:
-        {company_profile}
-        
-        Provide a comprehensive eligibility analysis with the following sections:
-        
-        1. **Summary of Eligibility**:
-           - Overall assessment of eligibility (Fully Eligible, Partially Eligible, Not Eligible)
-           - Executive summary of key findings
-        
-        2. **Mandatory Requirements Analysis**:
-           - Table listing all mandatory requirements from the RFP
-           - For each requirement, indicate whether the company meets it (Met, Partially Met, Not Met)
-           - Provide justification for each assessment based on the company profile
-        
-        3. **Gap Analysis**:
-           - Identify any significant gaps between RFP requirements and company capabilities
-           - Suggest possible ways to address these gaps (partnerships, new hires, etc.)
-        
-        4. **Competitive Position**:
-           - Assess how well the company is positioned compared to likely competitors
-           - Identify any unique advantages or disadvantages
-        
-        5. **Recommendation**:
-           - Clear recommendation on whether to proceed with a proposal
-           - If proceeding, note any special considerations that should be addressed in the proposal
-        
-        Format your response in markdown, with clear headings, tables, and bullet points.
-        Use factual, objective language based strictly on the information provided.
+        docx_content = await docx_file.read()
+        await docx_file.seek(0)  # Reset file pointer
+        return await self._docx_text(docx_content)
+
+    async def extract_text_from_pdf_file(self, pdf_path):
+        """
+        Extract text from a PDF file on disk
+        """
+        pdf_bytes = await asyncio.to_thread(read_file_bytes, pdf_path)
+        return await self.extract_text_from_pdf_bytes(pdf_bytes)
+
+    async def extract_text_from_pdf_bytes(self, pdf_bytes):
+        """
+        Extract text from PDF bytes, using Gemini's multimodal capabilities for scanned documents
+        """
+        text = await self._local_pdf_text(pdf_bytes)
+        if text is not None:
+            return text
+        
+        # Extract text using Gemini
+        prompt = """
+        Please extract all text content from this PDF document.
+        Return only the extracted text without any additional formatting or commentary.
+        Preserve the structure and organization of the content as much as possible.
         """
         
-        response = self.model.generate_content(prompt)
-        return response.text
+        response = await self._generate([
+            prompt,
+            {'mime_type': 'application/pdf', 'data': pdf_bytes}
+        ])
         
-    async def generate_project_proposal(self, rfp_text, company_profile):
+        return response.text
+
+    async def extract_text_from_uploaded_pdf(self, pdf_file):
         """
-        Generate a comprehensive project proposal addressing semantic gaps in typical proposals
+        Extract text from uploaded PDF file, passing its bytes straight through
         """
-        prompt = f"""
+        pdf_content = await pdf_file.read()
+        await pdf_file.seek(0)  # Reset file pointer
+        return await self.extract_text_from_pdf_bytes(pdf_content)
+      
+    async def analyze_eligibility(self, rfp_text, company_profile):
+        """
+        Analyze if the company meets the eligibility requirements in the RFP
+        """
+        return await self.run_prompt("eligibility_analysis", rfp_text=rfp_text, company_profile=company_profile)
+        
+    def _proposal_context(self, rfp_text, company_profile):
+        """Shared opening of every proposal prompt: role, RFP and company profile"""
+        return f"""
         You are an expert proposal writer specializing in strategic business transformation proposals. 
         Create a comprehensive, executive-ready project proposal that goes beyond basic technical delivery 
         to demonstrate strategic business value and competitive differentiation.
@@ -152,396 +1406,191 @@ class GeminiClient:
 
         Company Profile:
         {company_profile}
+        """
 
-        Create a proposal with the following enhanced sections:
-
-        1. **EXECUTIVE SUMMARY & STRATEGIC ALIGNMENT**:
-        - Quantifiable business impact and ROI projections with timelines
-        - Strategic alignment with client's long-term business objectives
-        - Competitive advantage creation and market positioning benefits
-        - Executive-level value propositions that resonate with C-suite decision makers
-
-        2. **COMPANY PROFILE & COMPETITIVE DIFFERENTIATION**:
-        - Unique market position and proprietary methodologies
-        - Industry-specific expertise and relevant case studies with measurable outcomes
-        - Innovation track record and emerging technology adoption
-        - Partnership ecosystem and vendor relationships
-
-        3. **BUSINESS TRANSFORMATION VISION**:
-        - Comprehensive understanding of client's industry challenges and market forces
-        - Digital transformation roadmap beyond immediate project scope
-        - Change management strategy addressing cultural and organizational transformation
-        - Future-state business capabilities and competitive positioning
-
-        4. **SOLUTION ARCHITECTURE & INNOVATION**:
-        - Modern, scalable architecture with cloud-native approaches
-        - AI/ML integration opportunities and data-driven insights
-        - API-first design and microservices architecture where applicable
-        - Security-by-design and compliance framework
-        - Emerging technology integration roadmap (IoT, blockchain, etc.)
-
-        5. **IMPLEMENTATION METHODOLOGY & RISK MITIGATION**:
-        - Agile/DevOps delivery methodology with continuous value delivery
-        - Comprehensive risk assessment with quantified impact analysis
-        - Scenario planning and contingency strategies
-        - Quality assurance framework and success metrics
-        - Stakeholder engagement and communication strategy
-
-        6. **TEAM STRUCTURE & CAPABILITY BUILDING**:
-        - Senior leadership involvement and escalation procedures
-        - Knowledge transfer and capability building programs
-        - Center of Excellence establishment
-        - Long-term skill development and certification roadmaps
-
-        7. **FINANCIAL MODEL & VALUE REALIZATION**:
-        - Detailed cost-benefit analysis with NPV calculations
-        - Phased investment approach with quick wins identification
-        - Total Economic Impact (TEI) analysis
-        - Cost optimization strategies and efficiency gains
-        - Flexible pricing models and payment structures
-
-        8. **RISK MANAGEMENT & BUSINESS CONTINUITY**:
-        - Enterprise risk assessment matrix with probability and impact scores
-        - Business continuity planning and disaster recovery strategies
-        - Vendor risk management and third-party dependencies
-        - Compliance and regulatory risk mitigation
-        - Change management risk assessment
-
-        9. **INNOVATION & FUTURE ROADMAP**:
-        - Technology evolution strategy and platform extensibility
-        - Industry 4.0 readiness and digital maturity advancement
-        - Sustainability and ESG considerations
-        - Competitive intelligence and market trend analysis
-        - Long-term partnership and growth opportunities
-
-        10. **SUCCESS METRICS & GOVERNANCE**:
-            - KPI framework with baseline establishment methodology
-            - Business value measurement and tracking systems
-            - Governance structure with executive oversight
-            - Continuous improvement processes and feedback loops
-            - Performance dashboards and reporting mechanisms
-
-        11. **CLIENT SUCCESS ENABLEMENT**:
-            - User adoption acceleration programs
-            - Training and certification pathways
-            - Support model and service level agreements
-            - Community building and best practice sharing
-            - Continuous optimization and enhancement services
-
-        12. **NEXT STEPS & PARTNERSHIP VISION**:
-            - Decision timeline and onboarding acceleration
-            - Strategic partnership framework
-            - Proof of concept or pilot program proposals
-            - Long-term relationship and growth planning
+    async def _proposal_section_calls(self, rfp_text, company_profile, max_concurrency):
+        """One pending request per proposal section, in document order, at most max_concurrency in flight"""
+        rfp_text = await self._prepare_context(rfp_text)
+        company_profile = await self._prepare_context(company_profile)
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-        FORMATTING REQUIREMENTS:
-        - Use professional markdown formatting with clear headings and subheadings
-        - Include tables for complex information (timelines, costs, risks)
-        - Add executive summary boxes for key value propositions
-        - Use bullet points for clarity and scanability
-        - Include quantified benefits wherever possible
-        - Ensure content is tailored to the specific industry and client context
-        - Write at an executive level that would impress C-suite decision makers
-        - Focus on business outcomes rather than just technical deliverables
+        context = self._proposal_context(rfp_text, company_profile)
 
-        TONE AND APPROACH:
-        - Strategic and consultative rather than purely technical
-        - Forward-thinking and innovation-focused
-        - Risk-aware but opportunity-driven
-        - Partnership-oriented rather than vendor-focused
-        - Quantified and metrics-driven where possible
+        async def generate_section(instructions):
+            prompt = context + instructions
+            async with semaphore:
+                return await self._generate_text(prompt, generation_config=PROPOSAL_GENERATION_CONFIG)
+
+        return [generate_section(instructions) for instructions in PROPOSAL_SECTION_INSTRUCTIONS]
+
+    async def generate_project_proposal(self, rfp_text, company_profile, max_concurrency=8):
         """
-        max_generation_config = genai.types.GenerationConfig(
-        temperature=0.3,           # Slightly creative but focused
-        top_p=0.8,                # Nucleus sampling
-        top_k=40,                 # Top-k sampling
-        max_output_tokens=8192,   # Maximum tokens for Gemini Pro
-        candidate_count=1,        # Number of response candidates
-        stop_sequences=None,      # No stop sequences for max output
-    )
-        response = self.model.generate_content(prompt, generation_config=max_generation_config)
-        return response.text
+        Generate a comprehensive project proposal addressing semantic gaps in typical proposals
+        Each section is its own request, all sections concurrently, so no section is cut off by a
+        shared output budget and the total time is roughly that of the slowest section
+        """
+        sections = await asyncio.gather(*await self._proposal_section_calls(rfp_text, company_profile, max_concurrency))
+        return "\n\n".join(sections)
+
+    async def stream_project_proposal(self, rfp_text, company_profile, max_concurrency=8):
+        """Same proposal as generate_project_proposal, yielded section by section in order as each is ready"""
+        tasks = [
+            asyncio.ensure_future(call)
+            for call in await self._proposal_section_calls(rfp_text, company_profile, max_concurrency)
+        ]
+        try:
+            for index, task in enumerate(tasks):
+                if index:
+                    yield "\n\n"
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
     
     async def analyze_competitive_landscape(self, rfp_text, company_profile):
         """
         Analyze competitive landscape and positioning
         """
-        prompt = f"""
-        Analyze the competitive landscape for this RFP and provide strategic positioning recommendations:
-        
-        RFP Text: {rfp_text}
-        Company Profile: {company_profile}
-        
-        Provide:
-        1. **Likely Competitors**: Who else will bid on this RFP?
-        2. **Competitive Advantages**: What are our unique differentiators?
-        3. **Competitive Threats**: Where might we be at a disadvantage?
-        4. **Positioning Strategy**: How should we position our proposal?
-        5. **Win Themes**: Key messages that will differentiate us
-        6. **Price Strategy**: Competitive pricing considerations
-        
-        Format in markdown with actionable recommendations.
-        """
-        response = self.model.generate_content(prompt)
-        return response.text
+        return await self.run_prompt("competitive_analysis", rfp_text=rfp_text, company_profile=company_profile)
 
     async def generate_executive_briefing(self, rfp_text, company_profile):
         """
         Generate C-suite level executive briefing
         """
-        prompt = f"""
-        Create an executive briefing document for C-level decision makers:
-        
-        RFP Text: {rfp_text}
-        Company Profile: {company_profile}
-        
-        Include:
-        1. **Strategic Opportunity Assessment** (2-3 sentences)
-        2. **Business Impact Summary** (quantified benefits)
-        3. **Investment Summary** (high-level costs and ROI)
-        4. **Risk Assessment** (top 3 risks and mitigations)
-        5. **Decision Recommendation** (Go/No-Go with rationale)
-        6. **Key Success Factors** (what needs to happen to win)
-        
-        Keep it concise - maximum 1 page when printed.
-        Use executive language focused on business value, not technical details.
-        """
-        response = self.model.generate_content(prompt)
-        return response.text
+        return await self.run_prompt("executive_briefing", rfp_text=rfp_text, company_profile=company_profile)
 
     async def assess_innovation_opportunities(self, rfp_text):
         """
         Identify opportunities for innovation and emerging technology integration
         """
-        prompt = f"""
-        Analyze this RFP for innovation and emerging technology opportunities:
-        
-        RFP Text: {rfp_text}
-        
-        Identify:
-        1. **AI/ML Integration Opportunities**: Where can AI add value?
-        2. **Automation Potential**: What processes can be automated?
-        3. **Data Analytics Opportunities**: What insights can be generated?
-        4. **Cloud-Native Advantages**: How can cloud architecture benefit the client?
-        5. **Industry 4.0 Applications**: IoT, edge computing, digital twin opportunities
-        6. **Future Technology Roadmap**: 2-3 year technology evolution plan
-        
-        Focus on business value and competitive advantage, not just technical possibilities.
-        """
-        response = self.model.generate_content(prompt)
-        return response.text
+        return await self.run_prompt("innovation_assessment", rfp_text=rfp_text)
     
     async def analyze_rfp(self, rfp_text):
         """
         Analyze the RFP document and provide a comprehensive breakdown
         """
-        prompt = f"""
-        You are an expert RFP analyst. Analyze the following RFP document and provide a detailed breakdown:
-        
-        RFP Text:
-        {rfp_text}
-        
-        Provide a comprehensive breakdown that includes:
-        1. Executive Summary - Brief overview of the RFP
-        2. Key Requirements - Critical requirements listed in the RFP
-        3. Evaluation Criteria - How proposals will be evaluated
-        4. Timeline - Important dates and deadlines
-        5. Budget Considerations - Any budget information provided
-        
-        Format your response in markdown.
-        """
-        
-        response = self.model.generate_content(prompt)
-        return response.text
+        return await self.run_prompt("rfp_breakdown", rfp_text=rfp_text)
     
     async def extract_requirements(self, rfp_text):
         """
         Extract specific requirements from the RFP text
         """
-        prompt = f"""
-        You are an expert in requirement analysis. Extract and categorize all requirements from the following RFP text:
-        
-        RFP Text:
-        {rfp_text}
-        
-        For each requirement:
-        1. Assign a unique ID (REQ-001, REQ-002, etc.)
-        2. Classify as Functional, Non-Functional, Technical, or Business
-        3. Assign a priority (Critical, High, Medium, Low)
-        4. Provide a clear, concise description
-        
-        Format your response as a markdown table with these columns:
-        | ID | Type | Priority | Requirement Description |
-        
-        Ensure all requirements are specific, measurable, and actionable.
-        """
-        
-        response = self.model.generate_content(prompt)
-        return response.text
+        return await self.run_prompt("requirements", rfp_text=rfp_text)
     
     async def generate_tasks(self, requirements):
         """
         Generate actionable Jira-style tasks based on the requirements
         """
-        prompt = f"""
-        You are a project manager experienced in breaking down requirements into actionable tasks. 
-        Based on the following requirements, create Jira-style tasks:
-        
-        Requirements:
-        {requirements}
-        
-        For each task:
-        1. Assign a unique ID (TASK-001, TASK-002, etc.)
-        2. Provide a short, descriptive title
-        3. Write a detailed description
-        4. Estimate effort (Story Points: 1, 2, 3, 5, 8, 13)
-        5. Assign a task type (Development, Testing, Documentation, Design)
-        6. Map to the requirement ID it fulfills
-        
-        Format your response as a markdown table with these columns:
-        | Task ID | Title | Description | Story Points | Type | Requirement ID |
-        
-        Ensure tasks are specific, actionable, and can be completed in 1-3 days of work.
+        return await self.run_prompt("tasks", requirements=requirements)
+
+    async def run_all_analyses(self, rfp_text, company_profile):
         """
-        
-        response = self.model.generate_content(prompt)
-        return response.text
+        Run the independent RFP analyses concurrently; tasks start as soon as requirements are ready
+        Returns (results, errors), both keyed by analysis name
+        """
+        results, errors = {}, {}
+
+        async def run(name, coro):
+            try:
+                results[name] = await coro
+            except Exception as e:
+                errors[name] = str(e)
+
+        async def requirements_then_tasks():
+            await run("requirements", self.extract_requirements(rfp_text))
+            if "requirements" in results:
+                await run("tasks", self.generate_tasks(results["requirements"]))
+
+        await asyncio.gather(
+            run("rfp_breakdown", self.analyze_rfp(rfp_text)),
+            run("eligibility_analysis", self.analyze_eligibility(rfp_text, company_profile)),
+            run("competitive_analysis", self.analyze_competitive_landscape(rfp_text, company_profile)),
+            run("innovation_assessment", self.assess_innovation_opportunities(rfp_text)),
+            run("executive_briefing", self.generate_executive_briefing(rfp_text, company_profile)),
+            requirements_then_tasks(),
+        )
+        return results, errors
 
 # this is my api
 
 
     async def extract_text_from_pdf_file_proposal(self, pdf_path: str):
         """Extract text from a PDF file using Gemini"""
-        try:
-            with open(pdf_path, "rb") as f:
-                pdf_bytes = f.read()
-
-           
-            prompt = """
-            Please extract all text content from this PDF document. 
-            Return only the extracted text without any additional formatting or commentary.
-            Preserve the structure and organization of the content as much as possible.
-            Also include the PDF page number for each section of text.
-            """
-
-            response = await self.model.generate_content_async(
-                [prompt, {"mime_type": "application/pdf", "data": pdf_bytes}]
-            )
+        pdf_bytes = await asyncio.to_thread(read_file_bytes, pdf_path)
+        return await self.extract_paged_pdf_bytes(pdf_bytes)
+
+    async def extract_paged_pdf_bytes(self, pdf_bytes: bytes):
+        """Extract page-numbered text from PDF bytes using Gemini"""
+        text = await self._local_pdf_text(pdf_bytes, page_numbers=True)
+        if text is not None:
+            return text
+
+        text = await self._extract_pdf_pages(pdf_bytes)
+        if text is not None:
+            return text
+
+        prompt = """
+        Please extract all text content from this PDF document. 
+        Return only the extracted text without any additional formatting or commentary.
+        Preserve the structure and organization of the content as much as possible.
+        Also include the PDF page number for each section of text.
+        """
 
-            if response and hasattr(response, "text") and response.text:
-                return response.text
-            else:
-                raise Exception("No text content returned from Gemini")
+        response = await self._generate(
+            [prompt, {"mime_type": "application/pdf", "data": pdf_bytes}]
+        )
 
-        except Exception as e:
-            raise Exception(f"Error extracting text from PDF: {str(e)}")
+        if response and hasattr(response, "text") and response.text:
+            return response.text
+        else:
+            raise Exception("No text content returned from Gemini")
 
     async def extract_text_from_uploaded_pdf_proposal(self, pdf_file):
         """Extract text from an uploaded PDF file"""
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                content = await pdf_file.read()
-                temp_file.write(content)
-                temp_file_path = temp_file.name
+        content = await pdf_file.read()
+        return await self.extract_paged_pdf_bytes(content)
 
-            try:
-                text = await self.extract_text_from_pdf_file_proposal(temp_file_path)
-                return text
-            finally:
-                os.unlink(temp_file_path)
-
-        except Exception as e:
-            raise Exception(f"Error processing uploaded PDF: {str(e)}")
 
     async def extract_text_from_docx_proposal(self, docx_file):
-        """Extract text from DOCX using Gemini"""
-        try:
-            content = await docx_file.read()
-            prompt = "Extract all text content from this DOCX file."
-
-            response = await self.model.generate_content_async(
-                [
-                    prompt,
-                    {
-                        "mime_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                        "data": content,
-                    },
-                ]
-            )
-
-            return response.text if response and hasattr(response, "text") else None
-
-        except Exception as e:
-            raise Exception(f"Error extracting text from DOCX: {str(e)}")
+        """Extract text from DOCX locally with python-docx, falling back to Gemini for image-only documents"""
+        content = await docx_file.read()
+        return await self._docx_text(content) or None
         
 
     
     async def extract_coast_file(self, pdf_path: str):
         """Extract text from a PDF file using Gemini"""
-        try:
-            with open(pdf_path, "rb") as f:
-                pdf_bytes = f.read()
-
-           
-            prompt = """
-            Please extract all text content from this PDF document. 
-            Return only the extracted text without any additional formatting or commentary.
-            Preserve the structure and organization of the content as much as possible.
-            Also include the PDF page number for each section of text.
-            """
-
-            response = await self.model.generate_content_async(
-                [prompt, {"mime_type": "application/pdf", "data": pdf_bytes}]
-            )
-
-            if response and hasattr(response, "text") and response.text:
-                return response.text
-            else:
-                raise Exception("No text content returned from Gemini")
-
-        except Exception as e:
-            raise Exception(f"Error extracting text from PDF: {str(e)}")
+        pdf_bytes = await asyncio.to_thread(read_file_bytes, pdf_path)
+        return await self.extract_paged_pdf_bytes(pdf_bytes)
 
     async def extract_text_coast_proposal(self, pdf_file):
         """Extract text from an uploaded PDF file"""
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                content = await pdf_file.read()
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-
-            try:
-                text = await self.extract_coast_file(temp_file_path)
-                return text
-            finally:
-                os.unlink(temp_file_path)
-
-        except Exception as e:
-            raise Exception(f"Error processing uploaded PDF: {str(e)}")
+        content = await pdf_file.read()
+        return await self.extract_paged_pdf_bytes(content)
 
     async def extract_text_from_docx_coast_proposal(self, docx_file):
-        """Extract text from DOCX using Gemini"""
-        try:
-            content = await docx_file.read()
-            prompt = "Extract all text content from this DOCX file."
-
-            response = await self.model.generate_content_async(
-                [
-                    prompt,
-                    {
-                        "mime_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                        "data": content,
-                    },
-                ]
-            )
-
-            return response.text if response and hasattr(response, "text") else None
-
-        except Exception as e:
-            raise Exception(f"Error extracting text from DOCX: {str(e)}")
+        """Extract text from DOCX locally with python-docx, falling back to Gemini for image-only documents"""
+        content = await docx_file.read()
+        return await self._docx_text(content) or None
         
     
     
+    def _component_prompt(self, proposal_text, extra_components=None):
+        """Build the prompt checking which key components are present in the proposal"""
+        components = [STANDARD_COMPONENTS_LIST]
+        
+        # Handle extra components
+        if extra_components:
+            if isinstance(extra_components, str):
+                extra_components = [extra_components]
+            for number, component in enumerate(extra_components, len(STANDARD_COMPONENTS) + 1):
+                components.append(f"  {number}. {component}")
+        
+        return prompt_with_inputs(
+            COMPONENT_ANALYSIS_INSTRUCTIONS + "\n".join(components) + "\n",
+            ("PROPOSAL TEXT", proposal_text),
+        )
+
     async def analysis_proposal(self, proposal_text, extra_components=None):
         """
         Check the key components that are present in the RFP proposal
@@ -553,56 +1602,12 @@ class GeminiClient:
         Returns:
             str: Analysis results in markdown table format
         """
-        standard_components = [
-            "1. Executive Summary / Project Overview",
-            "2. Scope of Work (In Scope)",
-            "3. Out of Scope",
-            "4. Prerequisites / Requirements",
-            "5. Deliverables",
-            "6. Timeline / Schedule",
-            "7. Technology Stack / Technical Requirements",
-            "8. Budget / Cost Estimation",
-            "9. Team Structure / Resources",
-            "10. Risk Assessment / Mitigation",
-            "11. Success Criteria / Acceptance Criteria",
-            "12. Testing Strategy",
-            "13. Maintenance & Support",
-            "14. Additional Comments / Notes"
-        ]
-        
-        # Create copy of standard components
-        components_to_check = standard_components.copy()
-        
-        # Handle extra components
-        if extra_components:
-            next_number = len(standard_components) + 1
-            
-            if isinstance(extra_components, str):
-                components_to_check.append(f"{next_number}. {extra_components}")
-            elif isinstance(extra_components, list):
-                for component in extra_components:
-                    components_to_check.append(f"{next_number}. {component}")
-                    next_number += 1
-        
-        components_list = "\n  ".join(components_to_check)
-        
-        prompt = f"""
-        You are a project manager experienced in analyzing RFP (Request for Proposal) documents. 
-        Based on the following proposal text, analyze which key RFP components are present:
-        
-        Proposal Text:
-        {proposal_text}
-        
-        The RFP components to check for are:
-        {components_list}
-        
-        Format your response as a markdown table with these columns:
-        | Component | Present (True/False) if true ✅ else ❌  | Details/Notes | PageNumber
-        
-        For each component, indicate whether it's present in the proposal and provide brief details if found.
-        """       
-        response = self.model.generate_content(prompt)
-        return response.text
+        return await self._generate_text(self._component_prompt(proposal_text, extra_components), task="component_analysis")
+
+    async def analysis_proposal_stream(self, proposal_text, extra_components=None):
+        """Same analysis as analysis_proposal, yielded chunk by chunk as it is generated"""
+        async for text in self._stream(self._component_prompt(proposal_text, extra_components), task="component_analysis"):
+            yield text
     
     
     
@@ -770,494 +1775,126 @@ class GeminiClient:
     
     
     
-    async def analyze_pricing(self, proposal_text, ai_analysis_details=None, costing_file_text=None, manual_costing_text=None):
+    async def _stream(self, prompt, key=None, namespace=None, **kwargs):
         """
-        Analyze pricing on a component-wise basis for detailed breakdown and evaluation
-        Uses proposal text along with costing files and AI analysis for comprehensive analysis
-        Only uses pricing sources that are actually provided
+        Yield response text chunks as the model produces them; a cached response comes back as one chunk
+        The response is cached under key, by default a hash of the prompt and config, and namespace
+        An identical stream already in flight is joined instead of calling the model again: its
+        response comes back as one chunk once complete, and if it fails or is abandoned the
+        joining stream makes its own call
         """
-        
-        # Prepare costing information section
-        costing_info = ""
-        if costing_file_text and manual_costing_text:
-            costing_info = f"""
-            COSTING FILE DATA:
-            {costing_file_text}
-            
-            MANUAL COSTING DATA:
-            {manual_costing_text}
-            """
-        elif costing_file_text:
-            costing_info = f"""
-            COSTING FILE DATA:
-            {costing_file_text}
-            """
-        elif manual_costing_text:
-            costing_info = f"""
-            MANUAL COSTING DATA:
-            {manual_costing_text}
-            """
-        else:
-            costing_info = "No additional costing data provided."
-        
-        # Prepare AI analysis section
-        ai_analysis_section = ""
-        if ai_analysis_details:
-            ai_analysis_section = f"""
-            AI ANALYSIS DETAILS (Component Scope Reference):
-            {ai_analysis_details}
-            """
-        else:
-            ai_analysis_section = "No AI analysis details provided. Analysis will be based on proposal text and costing data."
+        if key is None:
+            key = content_key(prompt, repr(sorted(kwargs.items())))
+        cached = self._cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+
+        pending = self._pending_streams.get(key)
+        if pending is not None:
+            text = await asyncio.shield(pending)
+            if text:
+                yield text
+                return
+
+        done = asyncio.get_running_loop().create_future()
+        self._pending_streams[key] = done
+        chunks, text = [], None
+        try:
+            response = await self._generate(prompt, stream=True, **kwargs)
+            async for chunk in response:
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+            text = "".join(chunks)
+            # An empty response is not worth replaying
+            if text:
+                self._response_cache.put(key, text, namespace)
+        finally:
+            if self._pending_streams.get(key) is done:
+                del self._pending_streams[key]
+            done.set_result(text)
+
+    def _pricing_inputs(self, proposal_text, ai_analysis_details=None, costing_file_text=None, manual_costing_text=None):
+        """Inputs of the component-wise pricing prompt, from whichever sources were provided"""
         
         # Determine available pricing sources for the prompt
         available_sources = ["Proposal"]
+        costing_inputs = []
         if costing_file_text:
             available_sources.append("Costing File")
+            costing_inputs.append(("COSTING FILE DATA", costing_file_text))
         if manual_costing_text:
             available_sources.append("Manual Costing")
-        
-        prompt = f"""
-        Perform a comprehensive component-wise price analysis on the following proposal.
-        Cross-reference pricing information from the proposal with any additional costing data provided.
-        
-        IMPORTANT: Only use pricing sources that are actually available. Do not calculate or reference prices from missing sources.
-        
-        AVAILABLE PRICING SOURCES: {', '.join(available_sources)}
-        
-        PROPOSAL TEXT:
-        {proposal_text}
-        
-        {ai_analysis_section}
-        
-        ADDITIONAL COSTING INFORMATION:
-        {costing_info}
-        
-        ---
-        COMPONENT-WISE PRICING ANALYSIS
-        
-        Based on the proposal text, AI analysis details (if available), and costing information provided, please analyze and present the pricing information in the following structured format:
-        
-        1. **COMPONENT SCOPE MAPPING**:
-        First, extract and list all components/deliverables from the proposal and available costing data:
-        - Map each component to its corresponding pricing from available sources only
-        - Cross-reference pricing between proposal and available costing files
-        - Identify discrepancies between different available pricing sources
-        - Flag any pricing items not covered in the scope
-        - Flag any scope items without clear pricing
-        
-        2. **PRICING SOURCES COMPARISON**:
-        Create a comparison table showing pricing from available sources only:
-        | Component | Proposal Price | {'Costing File Price | ' if costing_file_text else ''}{'Manual Costing Price | ' if manual_costing_text else ''}Variance | Recommended Price |
-        
-        3. **PRICING BREAKDOWN BY COMPONENT**:
-        Create a detailed table for each component:
-        | Component Name | Scope Description | Quantity | Unit Price | Total Price | Price Category | Source | Pricing Notes |
-        
-        For each component, identify:
-        - Component name and detailed description
-        - Quantity or units for pricing
-        - Individual unit pricing from available sources only
-        - Total cost for that component
-        - Category (Labor, Materials, Software, Hardware, Services, etc.)
-        - Primary pricing source (from available sources)
-        - Any special pricing conditions or notes
-        
-        4. **LABOR COMPONENT ANALYSIS**:
-        - Break down by role/skill level
-        - Hourly rates for each position from available sources only
-        - Total hours allocated per role
-        - Compare rates across available sources and with market standards
-        - Identify rate discrepancies between available sources
-        - Recommend optimal labor pricing structure
-        
-        5. **DELIVERABLE COMPONENT ANALYSIS**:
-        For each deliverable:
-        - Deliverable name and comprehensive description
-        - Associated costs from available sources only
-        - Pricing structure comparison
-        - Timeline impact on pricing
-        - Quality/complexity factors affecting price
-        - Recommended pricing based on source analysis
-        
-        6. **SERVICE COMPONENT ANALYSIS**:
-        - Professional services breakdown by available sources
-        - Implementation and deployment costs comparison from available sources
-        - Training costs per component across available sources
-        - Support and maintenance pricing variations from available sources
-        - Service level agreements and warranty cost differences from available sources
-        - Recommended service pricing structure
-        
-        7. **TECHNOLOGY COMPONENT ANALYSIS**:
-        - Software licenses and costs from available sources
-        - Hardware requirements and pricing variations from available sources
-        - Integration costs between components from available sources
-        - Maintenance and support cost comparisons from available sources
-        - Technology vendor pricing discrepancies from available sources
-        
-        8. **COMPONENT COST RANKING**:
-        - Rank all components by total cost (highest to lowest) based on available pricing
-        - Show percentage of total cost for each component based on available pricing
-        - Identify top 5 most expensive components based on available pricing
-        - Cost distribution analysis across available sources
-        - Price sensitivity analysis for major components based on available pricing
-        
-        9. **PRICING CONSISTENCY ANALYSIS**:
-        - Identify discrepancies between proposal and available costing data
-        - Flag significant price variations (>10% difference) between available sources
-        - Assess pricing methodology consistency across available sources
-        - Recommend pricing reconciliation actions based on available data
-        - Highlight potential pricing errors or omissions in available sources
-        
-        10. **COMPONENT-SPECIFIC RECOMMENDATIONS**:
-        For each major component:
-        - Pricing reasonableness assessment based on available sources
-        - Value proposition evaluation based on available pricing
-        - Risk factors and pricing contingencies based on available data
-        - Negotiation points and alternatives based on available pricing
-        - Cost optimization opportunities based on available sources
-        - Recommended final pricing with justification based on available data
-        
-        11. **PRICING OPTIMIZATION OPPORTUNITIES**:
-        - Bundle vs individual component pricing analysis based on available data
-        - Volume discount opportunities based on available pricing
-        - Alternative sourcing recommendations based on available data
-        - Timeline-based pricing optimizations based on available information
-        - Risk mitigation pricing strategies based on available sources
-        
-        12. **FINAL PRICING RECOMMENDATIONS**:
-        - Consolidated pricing table with recommended prices based on available sources
-        - Total project cost summary based on available pricing data
-        - Pricing rationale and source justification based on available information
-        - Implementation recommendations based on available data
-        - Contingency and risk pricing suggestions based on available sources
-        
-        CRITICAL INSTRUCTION: Only reference and calculate prices from sources that are actually provided. 
-        If a pricing source is missing, do not include it in calculations or comparisons.
-        If only proposal pricing is available, focus analysis on that single source.
-        
-        Format the response in clear markdown with tables where appropriate.
-        Ensure all analysis leverages information from available sources only.
-        Provide specific, actionable insights for each component with clear source attribution.
-        Highlight any critical pricing issues that require immediate attention.
+            costing_inputs.append(("MANUAL COSTING DATA", manual_costing_text))
+        if not costing_inputs:
+            costing_inputs.append(("ADDITIONAL COSTING INFORMATION", "No additional costing data provided."))
+        columns = "".join(f"{source} Price | " for source in available_sources)
+        
+        return (
+            ("AVAILABLE PRICING SOURCES", ", ".join(available_sources)),
+            ("COMPARISON TABLE COLUMNS", f"| Component | {columns}Variance | Recommended Price |"),
+            ("PROPOSAL TEXT", proposal_text),
+            ("AI ANALYSIS DETAILS (Component Scope Reference)", ai_analysis_details or
+             "No AI analysis details provided. Analysis will be based on proposal text and costing data."),
+            *costing_inputs,
+        )
+
+    async def analyze_pricing(self, proposal_text, ai_analysis_details=None, costing_file_text=None, manual_costing_text=None):
         """
+        Analyze pricing on a component-wise basis for detailed breakdown and evaluation
+        Uses proposal text along with costing files and AI analysis for comprehensive analysis
+        Only uses pricing sources that are actually provided
+        """
+        inputs = self._pricing_inputs(proposal_text, ai_analysis_details, costing_file_text, manual_costing_text)
         
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error in component-wise price analysis: {str(e)}"
+        return await self._generate_analysis(PRICING_INSTRUCTIONS, *inputs)
+
+    async def analyze_pricing_stream(self, proposal_text, ai_analysis_details=None, costing_file_text=None, manual_costing_text=None):
+        """Same analysis as analyze_pricing, yielded chunk by chunk as it is generated"""
+        inputs = self._pricing_inputs(proposal_text, ai_analysis_details, costing_file_text, manual_costing_text)
+        async for text in self._stream_analysis(PRICING_INSTRUCTIONS, *inputs):
+            yield text
 
 
     async def analyze_cost_realism(self, proposal_text, ai_analysis_details):
         """
         Implement FAR 15.404-1(d) Cost Realism Analysis
         """
-        prompt = f"""
-        Perform a comprehensive cost realism analysis on the following government contract proposal 
-        per FAR 15.404-1(d). Evaluate whether the proposed costs are realistic for the work to be performed.
-
-        PROPOSAL TEXT:
-        {proposal_text}
-
-        AI ANALYSIS DETAILS:
-        {ai_analysis_details}
-
-        ---
-        COST REALISM ANALYSIS REQUIREMENTS:
-
-        1. LABOR COST REALISM:
-        - Analyze proposed labor categories and skill levels
-        - Evaluate if labor hours are realistic for proposed tasks
-        - Compare labor rates with market standards and locality pay
-        - Assess if proposed labor mix matches technical requirements
-        - Flag any unusually high or low labor estimates
-
-        2. MATERIAL COST REALISM:
-        - Evaluate material quantities vs. work scope
-        - Assess material specifications and quality requirements
-        - Compare material costs with market prices
-        - Check for appropriate material waste/shrinkage factors
-        - Identify any missing or under-estimated materials
-
-        3. SUBCONTRACTOR COST REALISM:
-        - Analyze subcontractor selection and pricing
-        - Evaluate if subcontractor capabilities match requirements
-        - Assess prime contractor oversight and management costs
-        - Check for appropriate subcontractor profit margins
-
-        4. OVERHEAD AND INDIRECT COST ANALYSIS:
-        - Evaluate overhead rates for reasonableness
-        - Assess G&A expenses and allocation methods
-        - Review facilities costs and utilization rates
-        - Analyze other direct costs (ODCs) for appropriateness
-
-        5. SCHEDULE REALISM vs. COST:
-        - Evaluate if proposed timeline is achievable with proposed resources
-        - Assess potential for schedule compression costs
-        - Identify resource conflicts or unrealistic assumptions
-        - Check for adequate contingency in schedule and cost
-
-        6. TECHNICAL APPROACH vs. COST ALIGNMENT:
-        - Verify costs support proposed technical solution
-        - Identify any disconnects between approach and resources
-        - Assess if proposed team size matches work complexity
-        - Evaluate innovation/risk vs. cost trade-offs
-
-        ---
-        RISK ASSESSMENT:
-        
-        1. PERFORMANCE RISK:
-        - Identify areas where low costs may impact performance
-        - Assess contractor's ability to deliver with proposed resources
-        - Evaluate potential for cost growth during performance
-
-        2. SCHEDULE RISK:
-        - Analyze if costs support schedule commitments
-        - Identify resource-constrained critical path items
-        - Assess potential for schedule slippage due to underestimating
-
-        3. COST GROWTH RISK:
-        - Identify line items most likely to experience overruns
-        - Evaluate adequacy of management reserve/contingency
-        - Assess historical contractor performance on similar efforts
-
-        ---
-        FINAL COST REALISM DETERMINATION:
-        Provide:
-        - Overall cost realism assessment (Realistic/Unrealistic/Questionable)
-        - Specific areas of concern requiring clarification
-        - Recommended adjustments to most probable cost
-        - Risk mitigation strategies for identified concerns
-        - Suggested areas for negotiation or contractor clarification
-        
-        Format your response with clear sections and specific findings.
-        """
+        proposal_text = await self._prepare_context(proposal_text)
+        return await self._generate_analysis(COST_REALISM_INSTRUCTIONS, *cost_realism_inputs(proposal_text, ai_analysis_details))
 
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error in cost realism analysis: {str(e)}"
+    async def analyze_cost_realism_stream(self, proposal_text, ai_analysis_details):
+        """Same analysis as analyze_cost_realism, yielded chunk by chunk as it is generated"""
+        proposal_text = await self._prepare_context(proposal_text)
+        async for text in self._stream_analysis(COST_REALISM_INSTRUCTIONS, *cost_realism_inputs(proposal_text, ai_analysis_details)):
+            yield text
 
     async def technical_analysis_review(self, proposal_text):
         """
         Perform comprehensive technical analysis and evaluation
         """
-        prompt = f"""
-        Conduct a thorough technical analysis of the following proposal to evaluate the contractor's 
-        technical approach, capability, and likelihood of successful performance.
-
-        PROPOSAL TEXT:
-        {proposal_text}
-
-        ---
-        TECHNICAL ANALYSIS FRAMEWORK:
-
-        1. TECHNICAL APPROACH EVALUATION:
-        - Assess comprehensiveness of proposed solution
-        - Evaluate innovation and state-of-the-art considerations
-        - Analyze methodology and work breakdown structure
-        - Review integration of all technical requirements
-        - Identify any gaps or weaknesses in approach
-
-        2. TECHNICAL FEASIBILITY ASSESSMENT:
-        - Evaluate realistic achievability of proposed solution
-        - Assess technical risks and mitigation strategies
-        - Review compliance with technical specifications
-        - Analyze performance requirements vs. proposed capabilities
-        - Identify potential technical challenges
-
-        3. PAST PERFORMANCE CORRELATION:
-        - Assess relevance of cited past performance
-        - Evaluate scale and complexity comparisons
-        - Review lessons learned integration
-        - Analyze team continuity from past efforts
-        - Assess risk based on performance history
-
-        4. PERSONNEL AND QUALIFICATIONS:
-        - Evaluate key personnel qualifications vs. requirements
-        - Assess team composition and skill mix
-        - Review organizational structure and reporting
-        - Analyze staffing plan adequacy
-        - Identify potential resource constraints
-
-        5. FACILITIES AND EQUIPMENT:
-        - Assess facility adequacy for proposed work
-        - Evaluate equipment capabilities and availability
-        - Review security clearance and facility requirements
-        - Analyze geographic distribution if applicable
-        - Assess infrastructure support capabilities
-
-        6. SUBCONTRACTOR INTEGRATION:
-        - Evaluate subcontractor technical capabilities
-        - Assess prime contractor management approach
-        - Review work allocation and integration plans
-        - Analyze communication and coordination methods
-        - Assess overall team cohesion
-
-        ---
-        RISK ANALYSIS:
-
-        1. TECHNICAL PERFORMANCE RISKS:
-        - Identify high-risk technical areas
-        - Assess probability and impact of technical failures
-        - Evaluate backup plans and alternatives
-        - Review testing and validation approaches
-
-        2. SCHEDULE RISKS:
-        - Analyze critical path technical dependencies
-        - Assess resource loading and availability
-        - Evaluate parallel vs. sequential work planning
-        - Identify potential schedule compression impacts
-
-        3. INTEGRATION RISKS:
-        - Assess system integration complexity
-        - Evaluate interface management approach
-        - Review compatibility with existing systems
-        - Analyze interoperability requirements
-
-        ---
-        COMPLIANCE VERIFICATION:
-        - Verify compliance with all technical requirements
-        - Identify any deviations or exceptions
-        - Assess impact of proposed alternatives
-        - Review regulatory and standard compliance
-
-        ---
-        FINAL TECHNICAL ASSESSMENT:
-        Provide:
-        - Overall technical rating (Excellent/Good/Satisfactory/Marginal/Unsatisfactory)
-        - Key technical strengths and innovations
-        - Critical technical weaknesses or gaps
-        - Recommended areas for clarification
-        - Risk mitigation recommendations
-        - Technical evaluation summary for source selection
-        
-        Structure your response with clear headings and specific technical findings.
-        """
+        proposal_text = await self._prepare_context(proposal_text)
+        return await self._generate_analysis(TECHNICAL_ANALYSIS_INSTRUCTIONS, ("PROPOSAL TEXT", proposal_text), task="technical_analysis")
 
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error in technical analysis: {str(e)}"
+    async def technical_analysis_review_stream(self, proposal_text):
+        """Same analysis as technical_analysis_review, yielded chunk by chunk as it is generated"""
+        proposal_text = await self._prepare_context(proposal_text)
+        async for text in self._stream_analysis(TECHNICAL_ANALYSIS_INSTRUCTIONS, ("PROPOSAL TEXT", proposal_text), task="technical_analysis"):
+            yield text
 
     async def compliance_assessment(self, proposal_text):
         """
         Comprehensive compliance assessment against RFP requirements
         """
-        prompt = f"""
-        Perform a detailed compliance assessment of the following proposal to determine adherence 
-        to RFP requirements and identify any non-compliant areas.
-
-        PROPOSAL TEXT:
-        {proposal_text}
-
-        ---
-        COMPLIANCE ASSESSMENT AREAS:
-
-        1. PROPOSAL FORMAT AND SUBMISSION REQUIREMENTS:
-        - Verify adherence to page limits and formatting
-        - Check required sections and content organization
-        - Assess completeness of required submissions
-        - Review compliance with submission instructions
-        - Identify any missing required documents
-
-        2. TECHNICAL REQUIREMENTS COMPLIANCE:
-        - Verify compliance with all technical specifications
-        - Check adherence to performance requirements
-        - Assess compliance with quality standards
-        - Review regulatory and code compliance
-        - Identify any technical requirement gaps
-
-        3. CONTRACTUAL TERMS AND CONDITIONS:
-        - Assess acceptance of standard contract terms
-        - Review any proposed exceptions or deviations
-        - Evaluate compliance with special contract requirements
-        - Check adherence to delivery and performance terms
-        - Assess warranty and support commitments
-
-        4. CERTIFICATION AND REGISTRATION REQUIREMENTS:
-        - Verify required business registrations (SAM, CAGE)
-        - Check industry-specific certifications
-        - Assess personnel certification requirements
-        - Review facility accreditation needs
-        - Verify small business representations
-
-        5. SECURITY AND CLEARANCE REQUIREMENTS:
-        - Assess facility security clearance (FSC) compliance
-        - Verify personnel security clearance requirements
-        - Review information security protocols
-        - Check ITAR/EAR compliance if applicable
-        - Assess cybersecurity requirements adherence
-
-        6. ADMINISTRATIVE REQUIREMENTS:
-        - Verify cost/price proposal format compliance
-        - Check required cost breakdowns and supporting data
-        - Assess audit trail and cost traceability
-        - Review required representations and certifications
-        - Verify proper signature authorities
-
-        ---
-        SOCIOECONOMIC COMPLIANCE:
-
-        1. Small Business Requirements:
-        - Verify small business size standard compliance
-        - Check subcontracting plan requirements
-        - Assess HUBZone, SDVOSB, WOSB compliance
-        - Review mentor-protégé arrangements
-        - Evaluate small business participation goals
-
-        2. Equal Opportunity Compliance:
-        - Assess EEO compliance statements
-        - Review affirmative action commitments
-        - Check VEVRAA compliance
-        - Evaluate Section 503 compliance
-        - Assess diversity and inclusion commitments
-
-        ---
-        ENVIRONMENTAL AND SAFETY COMPLIANCE:
-        - Verify environmental regulation compliance
-        - Assess workplace safety requirements
-        - Check hazardous material handling protocols
-        - Review waste disposal and recycling plans
-        - Evaluate sustainability requirements
-
-        ---
-        DATA MANAGEMENT AND INTELLECTUAL PROPERTY:
-        - Assess data delivery requirements compliance
-        - Review intellectual property rights handling
-        - Check data rights and licensing terms
-        - Evaluate information handling protocols
-        - Assess government access requirements
-
-        ---
-        COMPLIANCE RISK ASSESSMENT:
-        - Identify critical compliance gaps
-        - Assess risk of non-compliance impacts
-        - Evaluate potential for cure/correction
-        - Assess past compliance performance
-        - Review compliance management systems
-
-        ---
-        FINAL COMPLIANCE DETERMINATION:
-        Provide:
-        - Overall compliance rating (Compliant/Conditionally Compliant/Non-Compliant)
-        - List of all compliance gaps or concerns
-        - Critical vs. minor compliance issues
-        - Recommended actions for compliance resolution
-        - Areas requiring clarification or correction
-        - Compliance risk assessment for contract award
-        
-        Format response with clear compliance status for each major area.
-        """
+        proposal_text = await self._prepare_context(proposal_text)
+        return await self._generate_analysis(COMPLIANCE_INSTRUCTIONS, ("PROPOSAL TEXT", proposal_text), task="compliance_assessment")
 
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error in compliance assessment: {str(e)}"
+    async def compliance_assessment_stream(self, proposal_text):
+        """Same analysis as compliance_assessment, yielded chunk by chunk as it is generated"""
+        proposal_text = await self._prepare_context(proposal_text)
+        async for text in self._stream_analysis(COMPLIANCE_INSTRUCTIONS, ("PROPOSAL TEXT", proposal_text), task="compliance_assessment"):
+            yield text
 
     async def analysis_proposal_summary(self, proposal_text, ai_analysis_details, price_analysis=None, 
                                 cost_realism=None, technical_analysis=None, compliance_assessment=None):
@@ -1275,113 +1912,123 @@ class GeminiClient:
         Returns:
             str: A comprehensive executive summary in markdown format suitable for decision-makers
         """
-        prompt = f"""
-        As a senior government contracts specialist, generate a comprehensive 2-3 page executive summary 
-        that synthesizes all analyses of this proposal. The summary should provide clear, actionable 
-        insights for procurement decision-makers.
-        
-        # INPUT DATA
-        
-        ## PROPOSAL CONTENT:
-        {proposal_text}
-        
-        ## DETAILED ANALYSES:
-        
-        **AI Component Analysis:**
-        {ai_analysis_details}
-        
-        **Price Analysis:**
-        {price_analysis if price_analysis else "Not performed"}
-        
-        **Cost Realism Assessment:**
-        {cost_realism if cost_realism else "Not performed"}
-        
-        **Technical Evaluation:**
-        {technical_analysis if technical_analysis else "Not performed"}
-        
-        **Compliance Verification:**
-        {compliance_assessment if compliance_assessment else "Not performed"}
-        
-        # REQUIRED OUTPUT STRUCTURE
-        
-        ## 1. EXECUTIVE OVERVIEW
-        - High-level proposal assessment (completeness, quality, competitiveness)
-        - Key statistics (page count, sections completed, compliance rate)
-        - Overall recommendation (Approve/Conditional Approval/Reject)
-        - Summary of most significant findings
-        
-        ## 2. COMPONENT ANALYSIS SUMMARY
-        - Table of critical components with status indicators:
-        | Component | Status (✅/❌) | Notes | Page Number |
-        |-----------|--------------|-------|----------------|
-        [Include all major components from analysis]
-        - Missing or incomplete elements
-        - Quality assessment of provided components
-        
-        ## 3. EVALUATION MATRIX
-        Create a quick-reference table summarizing all evaluation factors:
-        | Factor | Rating (1-5) | Strengths | Concerns |
-        |--------|-------------|-----------|----------|
-        | Technical Approach | | | |
-        | Price/Cost | | | |
-        | Compliance | | | |
-        | Risk | | | |
-        | Past Performance | | | |
-        
-        ## 4. DETAILED ASSESSMENT SECTIONS
-        
-        **A. Technical Evaluation**
-        - Approach adequacy and innovation
-        - Team qualifications
-        - Technical risks and mitigation
-        
-        **B. Price/Cost Analysis**
-        - Price competitiveness
-        - Cost realism findings
-        - Value proposition
-        - Budget alignment
-        
-        **C. Compliance Status**
-        - Mandatory requirements met/missing
-        - Conditional compliance items
-        - Documentation completeness
-        
-        ## 5. RISK ASSESSMENT
-        - Performance risk (High/Medium/Low)
-        - Cost growth potential
-        - Schedule risks
-        - Technical implementation risks
-        - Overall risk rating with justification
-        
-        ## 6. STRENGTHS & WEAKNESSES
-        - Top 3 proposal strengths
-        - Top 3 critical weaknesses
-        - Competitive advantages
-        - Areas requiring clarification
-        
-        ## 7. RECOMMENDATIONS & NEXT STEPS
-        - Award recommendation
-        - Required negotiations or clarifications
-        - Suggested contract type
-        - Special conditions if applicable
-        - Timeline for resolution if conditional
-        
-        # FORMATTING REQUIREMENTS
-        - Use professional government contracting terminology
-        - Include specific examples and page references
-        - Highlight critical decision points
-        - Balance conciseness with comprehensive coverage
-        - Use markdown formatting with clear headings
-        - Include quantitative metrics where available
-        
-        Generate approximately 1500-2000 words of detailed analysis suitable for senior leadership review.
+        inputs = summary_inputs(await self._prepare_context(proposal_text), ai_analysis_details, price_analysis,
+                                cost_realism, technical_analysis, compliance_assessment)
+        return await self._generate_analysis(SUMMARY_INSTRUCTIONS, *inputs)
+
+    async def analysis_proposal_summary_stream(self, proposal_text, ai_analysis_details, price_analysis=None,
+                                               cost_realism=None, technical_analysis=None, compliance_assessment=None):
+        """Same summary as analysis_proposal_summary, yielded chunk by chunk as it is generated"""
+        inputs = summary_inputs(await self._prepare_context(proposal_text), ai_analysis_details, price_analysis,
+                                cost_realism, technical_analysis, compliance_assessment)
+        async for text in self._stream_analysis(SUMMARY_INSTRUCTIONS, *inputs):
+            yield text
+
+    async def run_proposal_analyses(self, proposal_text, ai_analysis_details=None,
+                                    costing_file_text=None, manual_costing_text=None):
+        """
+        Run the price, cost realism, technical and compliance analyses concurrently,
+        then the executive summary over whichever of them succeeded
+        Returns (results, errors), both keyed by analysis name
+        """
+        results, errors = {}, {}
+
+        async def run(name, coro):
+            try:
+                results[name] = await coro
+            except Exception as e:
+                errors[name] = str(e)
+
+        await asyncio.gather(
+            run("price_analysis", self.analyze_pricing(proposal_text, ai_analysis_details, costing_file_text, manual_costing_text)),
+            run("cost_realism", self.analyze_cost_realism(proposal_text, ai_analysis_details)),
+            run("technical_analysis", self.technical_analysis_review(proposal_text)),
+            run("compliance_assessment", self.compliance_assessment(proposal_text)),
+        )
+        await run("proposal_summary", self.analysis_proposal_summary(
+            proposal_text,
+            ai_analysis_details,
+            results.get("price_analysis"),
+            results.get("cost_realism"),
+            results.get("technical_analysis"),
+            results.get("compliance_assessment"),
+        ))
+        return results, errors
+
+    async def run_full_analysis(self, proposal_text, extra_components=None,
+                                costing_file_text=None, manual_costing_text=None):
+        """
+        Run every proposal analysis from the proposal alone: technical and compliance run alongside
+        the component analysis, price and cost realism start as soon as the components are ready,
+        and the executive summary runs last
+        Returns (results, errors), both keyed by analysis name
+        """
+        results, errors = {}, {}
+
+        async def run(name, coro):
+            try:
+                results[name] = await coro
+            except Exception as e:
+                errors[name] = str(e)
+
+        async def components_then_costs():
+            await run("component_analysis", self.analysis_proposal(proposal_text, extra_components))
+            ai_analysis_details = results.get("component_analysis")
+            await asyncio.gather(
+                run("price_analysis", self.analyze_pricing(proposal_text, ai_analysis_details, costing_file_text, manual_costing_text)),
+                run("cost_realism", self.analyze_cost_realism(proposal_text, ai_analysis_details)),
+            )
+
+        await asyncio.gather(
+            run("technical_analysis", self.technical_analysis_review(proposal_text)),
+            run("compliance_assessment", self.compliance_assessment(proposal_text)),
+            components_then_costs(),
+        )
+        await run("proposal_summary", self.analysis_proposal_summary(
+            proposal_text,
+            results.get("component_analysis"),
+            results.get("price_analysis"),
+            results.get("cost_realism"),
+            results.get("technical_analysis"),
+            results.get("compliance_assessment"),
+        ))
+        return results, errors
+
+    async def analyze_all_in_one(self, proposal_text, ai_analysis_details=None):
         """
+        Produce the price, cost realism, technical, compliance and summary analyses in a single request
         
+        Args:
+            proposal_text: The main proposal content
+            ai_analysis_details: Component analysis from the flight check (optional)
+            
+        Returns:
+            dict: markdown strings keyed by price, cost_realism, technical, compliance and summary
+
+        Raises:
+            ValueError: the response was not a JSON object with all five analyses as strings,
+                e.g. because it was cut off at the output limit
+        """
+        prompt = prompt_with_inputs(
+            ALL_IN_ONE_INSTRUCTIONS,
+            ("PROPOSAL TEXT", await self._prepare_context(proposal_text)),
+            ("AI ANALYSIS DETAILS (Component Scope Reference)", ai_analysis_details or "Not provided"),
+        )
+        
+        response = await self._generate(prompt, generation_config=ALL_IN_ONE_GENERATION_CONFIG)
+        text = response.text.strip()
+        if text.startswith("```"):
+            text = text.strip("`").removeprefix("json").strip()
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating proposal summary: {str(e)}"
+            results = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError("The combined analysis response was not complete JSON; it may have been cut off at the output limit") from e
+        if not isinstance(results, dict):
+            raise ValueError("The combined analysis response was not a JSON object")
+        missing = [key for key in ALL_IN_ONE_KEYS if not isinstance(results.get(key), str) or not results[key].strip()]
+        if missing:
+            raise ValueError(f"The combined analysis response is missing: {', '.join(missing)}")
+        return {key: results[key] for key in ALL_IN_ONE_KEYS}
 
 
 
@@ -0,0 +1,74 @@
+import math
+import time
+from operator import mul
+from collections import OrderedDict
+
+
+def dot(a, b):
+    """Dot product of two equal-length vectors, multiplied and summed in C"""
+    return sum(map(mul, a, b))
+
+
+def unit_vector(v):
+    """v scaled to length 1, so cosine similarity with another unit vector is a single dot product"""
+    norm = math.sqrt(dot(v, v))
+    return tuple(x / norm for x in v) if norm else None
+
+
+class LLMCache:
+    """
+    In-memory cache of model responses
+    Exact lookups go by key; entries stored with a namespace and an embedding of their inputs
+    can also be found by similarity to another input in the same namespace
+    Embeddings are stored normalized, so a lookup costs one dot product per candidate
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        """Response stored under this exact key, if it has not expired"""
+        entry = self._live(key)
+        return entry[1] if entry else None
+
+    def put(self, key, text, namespace=None, embedding=None):
+        """Store a response, evicting the least recently used one when full"""
+        if embedding is not None:
+            embedding = unit_vector(embedding)
+        self._entries[key] = (time.monotonic() + self.ttl, text, namespace, embedding)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def nearest(self, namespace, embedding, threshold):
+        """Live response whose inputs are most similar to `embedding`, if at least `threshold` similar"""
+        embedding = unit_vector(embedding)
+        if embedding is None:
+            return None
+        now = time.monotonic()
+        best_key, best_score = None, threshold
+        for key, (expires, _, entry_namespace, entry_embedding) in list(self._entries.items()):
+            if expires < now:
+                del self._entries[key]
+                continue
+            if entry_namespace != namespace or entry_embedding is None:
+                continue
+            score = dot(embedding, entry_embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
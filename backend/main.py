@@ -1,100 +1,110 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from google.api_core.exceptions import GoogleAPIError
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict
 import os
+import asyncio
+import orjson
+from functools import lru_cache
 from gemini_client import GeminiClient
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="RFP Proposal Analyzer API", version="1.0.0")
+app = FastAPI(title="RFP Proposal Analyzer API", version="1.0.0", default_response_class=ORJSONResponse)
+# Extracted document text and analysis markdown compress well; bodies under 1 KB are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
 
 gemini = GeminiClient()
 
 
-async def process_uploaded_file_Proposal(uploaded_file: UploadFile):
-    """Process uploaded file and extract text using Gemini"""
-    if uploaded_file is not None:
-        file_type = uploaded_file.content_type
-        file_name = uploaded_file.filename
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-        try:
-            if file_type == "text/plain":
-                content = (await uploaded_file.read()).decode("utf-8")
-                return content
 
-            elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                content = await gemini.extract_text_from_docx_proposal(uploaded_file)
-                return content if content else None
+@lru_cache(maxsize=None)
+def load_bundled_text(filename):
+    """Read a text file shipped next to the API once per process; missing files read as empty"""
+    try:
+        with open(os.path.join(BASE_DIR, filename), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
 
-            elif file_type == "application/pdf":
-                content = await gemini.extract_text_from_uploaded_pdf_proposal(uploaded_file)
-                return content if content else None
 
-            else:
-                return None
+TEXT_MIME = "text/plain"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PDF_MIME = "application/pdf"
 
-        except Exception as e:
-            raise Exception(f"Error processing file {file_name}: {str(e)}")
 
-    return None
+async def read_text_file(uploaded_file: UploadFile):
+    """Decode a plain-text upload off the event loop"""
+    content = await asyncio.to_thread((await uploaded_file.read()).decode, "utf-8")
+    await uploaded_file.seek(0)
+    return content
 
-async def coast_Proposal_file(uploaded_file: UploadFile):
-    """Process uploaded file and extract text using Gemini"""
-    if uploaded_file is not None:
-        file_type = uploaded_file.content_type
-        file_name = uploaded_file.filename
 
-        try:
-            if file_type == "text/plain":
-                content = (await uploaded_file.read()).decode("utf-8")
-                return content
+EXTRACTORS_PROPOSAL = {
+    TEXT_MIME: read_text_file,
+    DOCX_MIME: gemini.extract_text_from_docx_proposal,
+    PDF_MIME: gemini.extract_text_from_uploaded_pdf_proposal,
+}
 
-            elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                content = await gemini.extract_text_from_docx_coast_proposal(uploaded_file)
-                return content if content else None
+EXTRACTORS_COAST = {
+    TEXT_MIME: read_text_file,
+    DOCX_MIME: gemini.extract_text_from_docx_coast_proposal,
+    PDF_MIME: gemini.extract_text_coast_proposal,
+}
 
-            elif file_type == "application/pdf":
-                content = await gemini.extract_text_coast_proposal(uploaded_file)
-                return content if content else None
+EXTRACTORS_RFP = {
+    TEXT_MIME: read_text_file,
+    DOCX_MIME: gemini.extract_text_from_docx,
+    PDF_MIME: gemini.extract_text_from_uploaded_pdf,
+}
 
-            else:
-                return None
 
-        except Exception as e:
-            raise Exception(f"Error processing file {file_name}: {str(e)}")
+# Uploads are spooled to disk by the multipart parser; this bounds what extraction reads into memory
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
 
-    return None
 
+async def process_uploaded_file(uploaded_file: UploadFile, extractors):
+    """Extract text from an uploaded file using the extractor registered for its content type"""
+    if uploaded_file is None:
+        return None
 
-async def process_uploaded_file(uploaded_file: UploadFile):
-    """Process uploaded file and extract text using Gemini"""
-    if uploaded_file is not None:
-        file_type = uploaded_file.content_type
-        file_name = uploaded_file.filename
+    if uploaded_file.size is not None and uploaded_file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"{uploaded_file.filename} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
 
-        try:
-            if file_type == "text/plain":
-                content = (await uploaded_file.read()).decode("utf-8")
-                await uploaded_file.seek(0) 
-                return content
+    extractor = extractors.get(uploaded_file.content_type)
+    if extractor is None:
+        return None
 
-            elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                content = await gemini.extract_text_from_docx(uploaded_file)
-                return content if content else None
+    content = await extractor(uploaded_file)
+    return content if content else None
 
-            elif file_type == "application/pdf":
-                content = await gemini.extract_text_from_uploaded_pdf(uploaded_file)
-                return content if content else None
 
-            else:
-                return None
+async def sse_events(chunks):
+    """Server-sent events for a stream of text chunks: one `data` event per chunk, then `done`, or `error` on failure"""
+    try:
+        async for text in chunks:
+            yield b"data: " + orjson.dumps({"delta": text}) + b"\n\n"
+    except Exception as e:
+        yield b"event: error\ndata: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+        return
+    yield b"event: done\ndata: {}\n\n"
 
-        except Exception as e:
-            raise Exception(f"Error processing file {file_name}: {str(e)}")
 
-    return None
+def sse_response(chunks):
+    """
+    StreamingResponse sending text chunks as server-sent events, unbuffered by proxies
+    The explicit identity encoding keeps GZipMiddleware from holding chunks back in its compressor
+    """
+    return StreamingResponse(
+        sse_events(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
 
 
 
@@ -118,62 +128,29 @@ class AnalysisResponse(BaseModel):
     status: str
     analyze_proposal: str
     error: Optional[str] = None
-class analyzePricingResponse(BaseModel):
+class GenericAnalysisResponse(BaseModel):
     status: str
     result: str
     error: Optional[str] = None
 
-class coastAnalysisResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
-class coastAnalysisRequest(BaseModel):
-    proposal_text: str
-    ai_analysis_details: Optional[str] = None
-class technicalAnalysisResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
-class technicalAnalysisRequest(BaseModel):
-    proposal_text: str
-    ai_analysis_details: Optional[str] = None
-    
-class complianceAnalysisResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
-class complianceAnalysisRequest(BaseModel):
+class ProposalAnalysisRequest(BaseModel):
     proposal_text: str
     ai_analysis_details: Optional[str] = None
 
-class summaryAnalysisResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
 class summaryAnalysisRequest(BaseModel):
     proposal_text: str
-    ai_analysis_details: Optional[str] 
-    component_analysis: Optional[str] 
-    price_analysis: Optional[str] 
-    cost_realism: Optional[str] 
-    technical_analysis: Optional[str] 
-    compliance_assessment: Optional[str] 
+    ai_analysis_details: Optional[str] = None
+    component_analysis: Optional[str] = None
+    price_analysis: Optional[str] = None
+    cost_realism: Optional[str] = None
+    technical_analysis: Optional[str] = None
+    compliance_assessment: Optional[str] = None
     
 
 class analyzeEligibilityRequest(BaseModel):
     rfp_text: str
     company_profile: Optional[str] = None
 
-class analyzeEligibilityResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
-    
-class RFPAnalysisResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
-
 class GenerateProposalRequest(BaseModel):
     rfp_text: str
     company_profile: str
@@ -189,14 +166,55 @@ class ExecutiveBriefingRequest(BaseModel):
 class InnovationOpportunitiesRequest(BaseModel):
     rfp_text: str
 
-class ExtractRequirementsResponse(BaseModel):
-    status: str
-    result: str
-    error: Optional[str] = None
+class RFPPipelineRequest(BaseModel):
+    rfp_text: str
+    company_profile: Optional[str] = None
 
 class GenerateTasksRequest(BaseModel):
     requirements: str
 
+class batchAnalysisResponse(BaseModel):
+    status: str
+    results: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    error: Optional[str] = None
+
+class bundleAnalysisRequest(BaseModel):
+    proposal_text: str
+    ai_analysis_details: Optional[str] = None
+    costing_file_text: Optional[str] = None
+    manual_costing_text: Optional[str] = None
+
+class fullAnalysisRequest(BaseModel):
+    proposal_text: str
+    extra_components: Optional[str] = None
+    costing_file_text: Optional[str] = None
+    manual_costing_text: Optional[str] = None
+
+class allInOneAnalysisResponse(BaseModel):
+    status: str
+    results: Dict[str, str] = {}
+    error: Optional[str] = None
+
+# ---------- Error Handlers ----------
+@app.exception_handler(GoogleAPIError)
+async def gemini_error_handler(request, exc):
+    """Gemini failures left over after the client's retries are an upstream error"""
+    return ORJSONResponse(status_code=502, content={"status": "error", "error": str(exc)})
+
+
+@app.exception_handler(asyncio.TimeoutError)
+async def gemini_timeout_handler(request, exc):
+    """A model call that kept timing out after the client's retries"""
+    return ORJSONResponse(status_code=504, content={"status": "error", "error": "The model did not respond in time"})
+
+
+@app.exception_handler(Exception)
+async def unexpected_error_handler(request, exc):
+    """Any other failure, in the same shape the routes use for errors"""
+    return ORJSONResponse(status_code=500, content={"status": "error", "error": str(exc)})
+
+
 # ---------- Routes ----------
 @app.get("/")
 async def root():
@@ -206,201 +224,248 @@ async def root():
 @app.post("/upload/proposal")
 async def upload_proposal_file(file: UploadFile = File(...)):
     """Upload and extract text from proposal file"""
-    try:
-        text = await process_uploaded_file_Proposal(file)
-
-        if text is None:
-            raise HTTPException(status_code=400, detail="Failed to process the file")
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "filename": file.filename,
-                "content_type": file.content_type,
-                "text": text,
-            },
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    text = await process_uploaded_file(file, EXTRACTORS_PROPOSAL)
+
+    if text is None:
+        raise HTTPException(status_code=400, detail="Failed to process the file")
+
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "status": "success",
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "text": text,
+        },
+    )
 
 
 @app.post("/analyze_proposal_components", response_model=AnalysisResponse)
 async def analyze_proposal_components(request: AnalysisRequest):
-    try:
-        analyze_proposal_result = await gemini.analysis_proposal(request.proposal_text, request.extra_components)
-        return AnalysisResponse(status="success", analyze_proposal=analyze_proposal_result)
-    except Exception as e:
-        return AnalysisResponse(status="error", analyze_proposal_result="", error=str(e))
+    analyze_proposal_result = await gemini.analysis_proposal(request.proposal_text, request.extra_components)
+    return AnalysisResponse(status="success", analyze_proposal=analyze_proposal_result)
+
+
+@app.post("/analyze_proposal_components/stream")
+async def stream_proposal_components(request: AnalysisRequest):
+    return sse_response(gemini.analysis_proposal_stream(request.proposal_text, request.extra_components))
     
     
 
 @app.post("/coast/proposal")
 async def upload_proposal_file(file: UploadFile = File(...)):
     """Upload and extract text from proposal file"""
-    try:
-        text = await coast_Proposal_file(file)
-
-        if text is None:
-            raise HTTPException(status_code=400, detail="Failed to process the file")
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "filename": file.filename,
-                "content_type": file.content_type,
-                "text": text,
-            },
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    text = await process_uploaded_file(file, EXTRACTORS_COAST)
+
+    if text is None:
+        raise HTTPException(status_code=400, detail="Failed to process the file")
+
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "status": "success",
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "text": text,
+        },
+    )
 
 
 
-@app.post("/analyze/pricing", response_model=analyzePricingResponse)
+@app.post("/analyze/pricing", response_model=GenericAnalysisResponse)
 async def analyze_pricing_api(request: analyzePricingRequest):
-    try:
-    
-        result = await gemini.analyze_pricing(request.proposal_text, request.costing_file_text, request.manual_costing_text)
-        return analyzePricingResponse(status="success", result=result)
-    except Exception as e:
-        return analyzePricingResponse(status="error", result="", error=str(e))
+    result = await gemini.analyze_pricing(request.proposal_text, request.ai_analysis_details, request.costing_file_text, request.manual_costing_text)
+    return GenericAnalysisResponse(status="success", result=result)
 
 
-@app.post("/analyze/cost-realism", response_model=coastAnalysisResponse)
-async def analyze_cost_realism(request: coastAnalysisRequest):
-    try:
-        result = await gemini.analyze_cost_realism(request.proposal_text, request.ai_analysis_details)
-        return coastAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return coastAnalysisResponse(status="error", result="", error=str(e))
+@app.post("/analyze/pricing/stream")
+async def analyze_pricing_stream(request: analyzePricingRequest):
+    return sse_response(
+        gemini.analyze_pricing_stream(request.proposal_text, request.ai_analysis_details, request.costing_file_text, request.manual_costing_text)
+    )
 
 
-@app.post("/analyze/technical", response_model= technicalAnalysisResponse)
-async def technical_analysis(request: technicalAnalysisRequest):
-    try:
-        result = await gemini.technical_analysis_review(request.proposal_text)
-        return technicalAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return technicalAnalysisResponse(status="error", result="", error=str(e))
+@app.post("/analyze/cost-realism", response_model=GenericAnalysisResponse)
+async def analyze_cost_realism(request: ProposalAnalysisRequest):
+    result = await gemini.analyze_cost_realism(request.proposal_text, request.ai_analysis_details)
+    return GenericAnalysisResponse(status="success", result=result)
 
 
-@app.post("/analyze/compliance", response_model=complianceAnalysisResponse)
-async def compliance_analysis(request: complianceAnalysisRequest):
-    try:
-        result = await  gemini.compliance_assessment(request.proposal_text)
-        return complianceAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return complianceAnalysisResponse(status="error", result="", error=str(e))
+@app.post("/analyze/cost-realism/stream")
+async def analyze_cost_realism_stream(request: ProposalAnalysisRequest):
+    return sse_response(gemini.analyze_cost_realism_stream(request.proposal_text, request.ai_analysis_details))
+
+
+@app.post("/analyze/technical", response_model= GenericAnalysisResponse)
+async def technical_analysis(request: ProposalAnalysisRequest):
+    result = await gemini.technical_analysis_review(request.proposal_text)
+    return GenericAnalysisResponse(status="success", result=result)
+
+
+@app.post("/analyze/technical/stream")
+async def technical_analysis_stream(request: ProposalAnalysisRequest):
+    return sse_response(gemini.technical_analysis_review_stream(request.proposal_text))
+
+
+@app.post("/analyze/compliance", response_model=GenericAnalysisResponse)
+async def compliance_analysis(request: ProposalAnalysisRequest):
+    result = await  gemini.compliance_assessment(request.proposal_text)
+    return GenericAnalysisResponse(status="success", result=result)
+
+
+@app.post("/analyze/compliance/stream")
+async def compliance_analysis_stream(request: ProposalAnalysisRequest):
+    return sse_response(gemini.compliance_assessment_stream(request.proposal_text))
+
+
+@app.post("/analyze/bundle", response_model=batchAnalysisResponse)
+async def analyze_bundle(request: bundleAnalysisRequest):
+    """Price, cost realism, technical and compliance concurrently, then the summary, in one request"""
+    results, errors = await gemini.run_proposal_analyses(
+        request.proposal_text,
+        request.ai_analysis_details,
+        request.costing_file_text,
+        request.manual_costing_text,
+    )
+    return batchAnalysisResponse(status="success", results=results, errors=errors)
+
+
+@app.post("/analyze/all", response_model=batchAnalysisResponse)
+async def analyze_all(request: fullAnalysisRequest):
+    """Component analysis and every step 3-5 analysis from the proposal alone, then the summary"""
+    results, errors = await gemini.run_full_analysis(
+        request.proposal_text,
+        request.extra_components,
+        request.costing_file_text,
+        request.manual_costing_text,
+    )
+    return batchAnalysisResponse(status="success", results=results, errors=errors)
 
 
-@app.post("/generate/summary", response_model=summaryAnalysisResponse)
+@app.post("/analyze/all-in-one", response_model=allInOneAnalysisResponse)
+async def analyze_all_in_one(request: ProposalAnalysisRequest):
+    """Price, cost realism, technical, compliance and summary from one model call"""
+    results = await gemini.analyze_all_in_one(request.proposal_text, request.ai_analysis_details)
+    return allInOneAnalysisResponse(status="success", results=results)
+
+
+@app.post("/generate/summary", response_model=GenericAnalysisResponse)
 async def generate_summary(request: summaryAnalysisRequest ):
-    try:
-        result = await gemini.analysis_proposal_summary(
-            request.proposal_text,
-            request.ai_analysis_details,
-            request.price_analysis,
-            request.cost_realism,
-            request.technical_analysis,
-            request.compliance_assessment,
-        )
-        return summaryAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return summaryAnalysisResponse(status="error", result="", error=str(e))
+    result = await gemini.analysis_proposal_summary(
+        request.proposal_text,
+        request.ai_analysis_details,
+        request.price_analysis,
+        request.cost_realism,
+        request.technical_analysis,
+        request.compliance_assessment,
+    )
+    return GenericAnalysisResponse(status="success", result=result)
+
+
+@app.post("/generate/summary/stream")
+async def generate_summary_stream(request: summaryAnalysisRequest):
+    return sse_response(gemini.analysis_proposal_summary_stream(
+        request.proposal_text,
+        request.ai_analysis_details,
+        request.price_analysis,
+        request.cost_realism,
+        request.technical_analysis,
+        request.compliance_assessment,
+    ))
 
 
 @app.post("/upload/create/rfp")
 async def upload_create_rfp_file(file: UploadFile = File(...)):
     """Upload and extract text from proposal file"""
-    try:
-        text = await process_uploaded_file(file)
-
-        if text is None:
-            raise HTTPException(status_code=400, detail="Failed to process the file")
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "success",
-                "filename": file.filename,
-                "content_type": file.content_type,
-                "text": text,
-            },
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    text = await process_uploaded_file(file, EXTRACTORS_RFP)
+
+    if text is None:
+        raise HTTPException(status_code=400, detail="Failed to process the file")
+
+    return ORJSONResponse(
+        status_code=200,
+        content={
+            "status": "success",
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "text": text,
+        },
+    )
     
     
-@app.post("/rfp/analyze_eligibility", response_model=analyzeEligibilityResponse)
+@app.get("/rfp/sample")
+async def sample_rfp():
+    """Bundled sample RFP text for trying out the RFP tools"""
+    return {"text": load_bundled_text("sample_rfp.txt")}
+
+
+@app.post("/rfp/analyze_eligibility", response_model=GenericAnalysisResponse)
 async def compliance_analysis(request: analyzeEligibilityRequest):
-    try:
-        result = await  gemini.analyze_eligibility(request.rfp_text, request.company_profile)
-        return analyzeEligibilityResponse(status="success", result=result)
-    except Exception as e:
-        return analyzeEligibilityResponse(status="error", result="", error=str(e))
+    company_profile = request.company_profile or load_bundled_text("company_profile.txt")
+    result = await gemini.analyze_eligibility(request.rfp_text, company_profile)
+    return GenericAnalysisResponse(status="success", result=result)
 
 
 
-@app.post("/rfp/generate-proposal", response_model=RFPAnalysisResponse)
+@app.post("/rfp/generate-proposal", response_model=GenericAnalysisResponse)
 async def generate_proposal(request: GenerateProposalRequest):
-    try:
-        result = await gemini.generate_project_proposal(request.rfp_text, request.company_profile)
-        return RFPAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return RFPAnalysisResponse(status="error", result="", error=str(e))
+    result = await gemini.generate_project_proposal(request.rfp_text, request.company_profile)
+    return GenericAnalysisResponse(status="success", result=result)
+
+@app.post("/rfp/generate-proposal/stream")
+async def stream_proposal(request: GenerateProposalRequest):
+    return sse_response(gemini.stream_project_proposal(request.rfp_text, request.company_profile))
 
-@app.post("/rfp/competitive-landscape", response_model=RFPAnalysisResponse)
+@app.post("/rfp/competitive-landscape", response_model=GenericAnalysisResponse)
 async def analyze_competitive_landscape(request: CompetitiveLandscapeRequest):
-    try:
-        result = await gemini.analyze_competitive_landscape(request.rfp_text, request.company_profile)
-        return RFPAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return RFPAnalysisResponse(status="error", result="", error=str(e))
+    result = await gemini.analyze_competitive_landscape(request.rfp_text, request.company_profile)
+    return GenericAnalysisResponse(status="success", result=result)
 
-@app.post("/rfp/executive-briefing", response_model=RFPAnalysisResponse)
+@app.post("/rfp/executive-briefing", response_model=GenericAnalysisResponse)
 async def generate_executive_briefing(request: ExecutiveBriefingRequest):
-    try:
-        result = await gemini.generate_executive_briefing(request.rfp_text, request.company_profile)
-        return RFPAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return RFPAnalysisResponse(status="error", result="", error=str(e))
+    result = await gemini.generate_executive_briefing(request.rfp_text, request.company_profile)
+    return GenericAnalysisResponse(status="success", result=result)
 
-@app.post("/rfp/innovation-opportunities", response_model=RFPAnalysisResponse)
+@app.post("/rfp/innovation-opportunities", response_model=GenericAnalysisResponse)
 async def assess_innovation_opportunities(request: InnovationOpportunitiesRequest):
-    try:
-        result = await gemini.assess_innovation_opportunities(request.rfp_text)
-        return RFPAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return RFPAnalysisResponse(status="error", result="", error=str(e))
+    result = await gemini.assess_innovation_opportunities(request.rfp_text)
+    return GenericAnalysisResponse(status="success", result=result)
     
-@app.post("/rfp/analyze", response_model=RFPAnalysisResponse)
+
+@app.post("/rfp/pipeline", response_model=batchAnalysisResponse)
+async def rfp_pipeline(request: RFPPipelineRequest):
+    """Run the RFP analyses concurrently; tasks start as soon as requirements are ready"""
+    company_profile = request.company_profile or load_bundled_text("company_profile.txt")
+    results, errors = await gemini.run_all_analyses(request.rfp_text, company_profile)
+    return batchAnalysisResponse(status="success", results=results, errors=errors)
+
+
+@app.post("/rfp/analyze", response_model=GenericAnalysisResponse)
 async def analyze_rfp(request: RFPAnalysisRequest):
-    try:
-        result = await gemini.analyze_rfp(request.rfp_text)
-        return RFPAnalysisResponse(status="success", result=result)
-    except Exception as e:
-        return RFPAnalysisResponse(status="error", result="", error=str(e))
+    result = await gemini.analyze_rfp(request.rfp_text)
+    return GenericAnalysisResponse(status="success", result=result)
 
-@app.post("/rfp/extract-requirements", response_model=ExtractRequirementsResponse)
+@app.post("/rfp/extract-requirements", response_model=GenericAnalysisResponse)
 async def extract_requirements(request: RFPAnalysisRequest):
-    try:
-        result = await gemini.extract_requirements(request.rfp_text)
-        return ExtractRequirementsResponse(status="success", result=result)
-    except Exception as e:
-        return ExtractRequirementsResponse(status="error", result="", error=str(e))
+    result = await gemini.extract_requirements(request.rfp_text)
+    return GenericAnalysisResponse(status="success", result=result)
 
-@app.post("/rfp/generate-tasks", response_model=ExtractRequirementsResponse)
+@app.post("/rfp/generate-tasks", response_model=GenericAnalysisResponse)
 async def generate_tasks(request: GenerateTasksRequest):
-    try:
-        result = await gemini.generate_tasks(request.requirements)
-        return ExtractRequirementsResponse(status="success", result=result)
-    except Exception as e:
-        return ExtractRequirementsResponse(status="error", result="", error=str(e))
+    result = await gemini.generate_tasks(request.requirements)
+    return GenericAnalysisResponse(status="success", result=result)
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="127.0.0.1", port=8501)
\ No newline at end of file
+    # Each worker has its own response cache and Gemini rate limiter, so with several
+    # workers set GEMINI_REQUESTS_PER_MINUTE to the per-worker share of the quota.
+    # The event loop and HTTP parser default to uvloop and httptools when installed.
+    uvicorn.run(
+        "main:app",
+        host="127.0.0.1",
+        port=8501,
+        workers=int(os.getenv("API_WORKERS", "1")),
+        timeout_keep_alive=30,
+    )
\ No newline at end of file
@@ -2,16 +2,23 @@ import streamlit as st
 import pandas as pd
 import time
 import json
+import io
 import os
+import re
+import mmap
+import types
+import weakref
+import tempfile
+import hashlib
+import zipfile
 import requests
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 from pathlib import Path
 
 from streamlit_extras.colored_header import colored_header
 from streamlit_extras.add_vertical_space import add_vertical_space
-from streamlit_extras.metric_cards import style_metric_cards
-from streamlit_extras.stylable_container import stylable_container
 from streamlit_lottie import st_lottie
 from fpdf import FPDF
 
@@ -20,19 +27,239 @@ load_dotenv()
 
 BACKEND_URL="http://0.0.0.0:8501"
 
-def upload_and_extract_text(file):
+# The background pool is shared by every session in the process: each session runs up to
+# JOBS_PER_SESSION jobs at once (steps 3-5 and the step 6 summary), so it is sized for
+# ANALYSIS_SESSIONS sessions analysing at the same time without queueing behind each other
+JOBS_PER_SESSION = 4
+ANALYSIS_SESSIONS = int(os.getenv("ANALYSIS_SESSIONS", "8"))
+ANALYSIS_WORKERS = JOBS_PER_SESSION * ANALYSIS_SESSIONS
+_EXECUTOR = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+# Longest the page waits on a background job before reporting it as failed
+ANALYSIS_TIMEOUT = int(os.getenv("ANALYSIS_TIMEOUT", "600"))
+
+# Keep-alive connections shared by every backend call, enough for the executor plus each session's own thread
+_SESSION = requests.Session()
+_SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=ANALYSIS_WORKERS + ANALYSIS_SESSIONS))
+
+# Inline markdown (**bold**, *italic*, `code`) stripped from PDF report lines
+_MD_INLINE = re.compile(r'\*\*(.*?)\*\*|\*(.*?)\*|`(.*?)`')
+
+# (prefix, font size, line height, spacing after) for PDF report headings
+PDF_HEADERS = (
+    ('# ', 16, 10, 5),
+    ('## ', 14, 8, 3),
+    ('### ', 12, 6, 2),
+)
+
+APP_CSS = """
+<style>
+.main-header {
+    text-align: center;
+    padding: 1rem 0;
+    background: linear-gradient(90deg, #1f77b4, #17becf);
+    color: white;
+    border-radius: 10px;
+    margin-bottom: 2rem;
+}
+
+.component-card {
+    background: #f8f9fa;
+    padding: 1rem;
+    border-radius: 8px;
+    border-left: 4px solid #28a745;
+    margin: 0.5rem 0;
+}
+
+.component-card.missing {
+    border-left-color: #dc3545;
+}
+
+.component-grid {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    column-gap: 1rem;
+}
+
+.progress-step {
+    padding: 0.5rem;
+    margin: 0.25rem 0;
+    border-radius: 5px;
+    background: #f1f3f4;
+}
+
+.progress-step.completed {
+    background: #d4edda;
+    border-left: 3px solid #28a745;
+}
+
+.progress-step.current {
+    background: #fff3cd;
+    border-left: 3px solid #ffc107;
+}
+
+.create-proposal-btn {
+    position: fixed;
+    top: 100px;
+    right: 20px;
+    z-index: 1000;
+}
+
+.analysis-section {
+    background: #f8f9fa;
+    padding: 1.5rem;
+    border-radius: 10px;
+    margin: 1rem 0;
+    border: 1px solid #dee2e6;
+}
+</style>
+"""
+
+# Read-only: shared by every session, callers must not mutate it
+BASE_COMPONENTS = types.MappingProxyType({
+    "Executive Summary": "✅",
+    "Scope of Work": "✅",
+    "Out of Scope": "✅",
+    "Prerequisites": "✅",
+    "Deliverables": "✅",
+    "Timeline": "✅",
+    "Technology Stack": "✅",
+    "Budget": "✅",
+    "Team Structure": "✅",
+    "Risk Assessment": "✅",
+    "Success Criteria": "✅",
+})
+
+# (name, icon) for each step in the sidebar progress tracker
+ANALYSIS_STEPS = (
+    ("Flight Check", "✈️"),
+    ("Price Analysis", "💰"),
+    ("Cost Realism Check", "📊"),
+    ("Technical Analysis Review", "🔧"),
+    ("Compliance Assessment", "📋"),
+    ("Generate Summary Report", "📄"),
+)
+TOTAL_STEPS = len(ANALYSIS_STEPS)
+
+# Results derived from the current document, cleared when a new one is uploaded
+DOCUMENT_RESULT_KEYS = (
+    'proposal_analysis', 'ai_analysis_details', 'pricing_analysis_done', 'price_analysis',
+    'cost_realism', 'unbalanced_pricing', 'technical_analysis', 'compliance_assessment',
+    'proposal_summary', 'pdf_requested',
+)
+
+# Per-proposal state, restored by "Reset Analysis"
+PROPOSAL_STATE_DEFAULTS = {
+    'step': 1,
+    'proposal_file': None,
+    'proposal_analysis': None,
+    'ai_analysis_details': None,
+    'proposal_summary': None,
+    'extra_component': "",
+    'current_filename': None,
+    'current_file_id': None,
+    'current_file_hash': None,
+    'proposal_stats': (0, 0),
+    'proposal_preview': "",
+    'costing_file_id': None,
+    'costing_file_text': None,
+    'manual_costing_text': "",
+    'final_costing_text': None,
+    'pricing_analysis_done': False,
+    'price_analysis': None,
+    'cost_realism': None,
+    'unbalanced_pricing': None,
+    'technical_analysis': None,
+    'compliance_assessment': None,
+    'processing': False,
+    'analysis_futures': None,
+    'summary_future': None,
+    'pdf_requested': False,
+}
+
+SESSION_DEFAULTS = {
+    'mode': "with_proposal",
+    **PROPOSAL_STATE_DEFAULTS,
+    'current_step': 1,
+    'new_feature': "",
+    'pricing_file_text': None,
+}
+
+
+def file_fingerprint(file):
+    """Content hash of an uploaded file, used as the extraction cache key"""
+    return hashlib.blake2b(file.getvalue(), digest_size=16).hexdigest()
+
+
+def remove_file(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class ProposalFile:
+    """
+    Extracted proposal text in a temp file, so session state and background jobs hold a path, not the text
+    The file is removed by discard(), when the session's state is garbage collected, or at process exit
+    """
+
+    def __init__(self, text):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as temp_file:
+            temp_file.write(text.encode("utf-8"))
+        self.path = temp_file.name
+        self._finalizer = weakref.finalize(self, remove_file, self.path)
+
+    def discard(self):
+        self._finalizer()
+
+
+def store_proposal_text(text):
+    """Write extracted proposal text to a temp file, replacing the session's previous one"""
+    if st.session_state.proposal_file:
+        st.session_state.proposal_file.discard()
+    st.session_state.proposal_file = ProposalFile(text)
+
+
+def read_proposal_text(path):
+    """Decode proposal text from its memory-mapped temp file"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, "utf-8")
+
+
+def get_proposal_text():
+    """The current proposal text; decode it once per action and pass it down rather than calling this repeatedly"""
+    proposal_file = st.session_state.proposal_file
+    if proposal_file is None or not os.path.exists(proposal_file.path):
+        return ""
+    return read_proposal_text(proposal_file.path)
+
+
+@st.cache_data(show_spinner=False, persist="disk", max_entries=64)
+def extract_text_cached(endpoint, file_hash, file_name, file_type, _file_bytes):
+    """Extract text via the backend, cached on disk by content hash"""
+    files = {"file": (file_name, _file_bytes, file_type)}
+    response = _SESSION.post(f'{BACKEND_URL}{endpoint}', files=files)
+    response.raise_for_status()
+    data = response.json()
+
+    if "text" not in data:
+        raise ValueError("No text returned from API.")
+    return data["text"]
+
+
+def upload_and_extract_text(file, file_hash=None, endpoint="/upload/proposal"):
     """Send file to FastAPI backend for extraction"""
     try:
-        files = {"file": (file.name, file, file.type)}
-        response = requests.post(f'{BACKEND_URL}/upload/proposal', files=files)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "text" in data:
-            return data["text"]
-        else:
-            st.error("No text returned from API.")
-            return None
+        if file_hash is None:
+            file_hash = file_fingerprint(file)
+        return extract_text_cached(endpoint, file_hash, file.name, file.type, file.getvalue())
+    except ValueError as e:
+        st.error(str(e))
+        return None
     except Exception as e:
         st.error(f"Error calling API: {e}")
         return None
@@ -46,7 +273,7 @@ def analyze_proposal(proposal_text, extra_components):
             "extra_components": extra_components
         }
         
-        response = requests.post(
+        response = _SESSION.post(
             f'{BACKEND_URL}/analyze_proposal_components',
             headers={'Content-Type': 'application/json'},
             data=json.dumps(data)
@@ -66,14 +293,16 @@ def analyze_proposal(proposal_text, extra_components):
         return None, f"Request failed: {str(e)}"
 
 
-def analyze_pricing_api(proposal_text, ai_analysis_details):
+def analyze_pricing_api(proposal_text, ai_analysis_details, costing_file_text=None, manual_costing_text=None):
     try:
         data = {
             "proposal_text": proposal_text,
-            "ai_analysis_details": ai_analysis_details
+            "ai_analysis_details": ai_analysis_details,
+            "costing_file_text": costing_file_text,
+            "manual_costing_text": manual_costing_text
         }
         
-        analyze_pricing_api_response = requests.post(
+        analyze_pricing_api_response = _SESSION.post(
             f'{BACKEND_URL}/analyze/pricing',
             headers={'Content-Type': 'application/json'},
             data=json.dumps(data)
@@ -97,6 +326,48 @@ def analyze_pricing_api(proposal_text, ai_analysis_details):
         return None, f"Unexpected error: {str(e)}"
 
 
+def iter_sse(response):
+    """Text deltas from a server-sent event stream; an `error` event is raised as a RequestException"""
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            payload = json.loads(line[len("data:"):])
+            if event == "error":
+                raise requests.exceptions.RequestException(payload.get("error", "Unknown error"))
+            if event == "done":
+                return
+            if payload.get("delta"):
+                yield payload["delta"]
+        elif not line:
+            event = None
+
+
+def stream_pricing_api(proposal_text, ai_analysis_details, costing_file_text=None, manual_costing_text=None):
+    """Yield the pricing analysis text as the backend streams it"""
+    data = {
+        "proposal_text": proposal_text,
+        "ai_analysis_details": ai_analysis_details,
+        "costing_file_text": costing_file_text,
+        "manual_costing_text": manual_costing_text
+    }
+    with _SESSION.post(f'{BACKEND_URL}/analyze/pricing/stream', json=data, stream=True) as response:
+        response.raise_for_status()
+        yield from iter_sse(response)
+
+
+def stream_component_analysis_api(proposal_text, extra_components):
+    """Yield the component analysis text as the backend streams it"""
+    data = {
+        "proposal_text": proposal_text,
+        "extra_components": extra_components
+    }
+    with _SESSION.post(f'{BACKEND_URL}/analyze_proposal_components/stream', json=data, stream=True) as response:
+        response.raise_for_status()
+        yield from iter_sse(response)
+
+
 def analyze_cost_realism_api(proposal_text, ai_analysis_details):
     try:
         data = {
@@ -104,7 +375,7 @@ def analyze_cost_realism_api(proposal_text, ai_analysis_details):
             "ai_analysis_details": ai_analysis_details
         }
         
-        response = requests.post(
+        response = _SESSION.post(
             f'{BACKEND_URL}/analyze/cost-realism',
             headers={'Content-Type': 'application/json'},
             data=json.dumps(data)
@@ -130,7 +401,7 @@ def analyze_technical_api(proposal_text, ai_analysis_details):
             "ai_analysis_details": ai_analysis_details
         }
         
-        response = requests.post(
+        response = _SESSION.post(
             f'{BACKEND_URL}/analyze/technical',
             headers={'Content-Type': 'application/json'},
             data=json.dumps(data)
@@ -156,7 +427,7 @@ def analyze_compliance_api(proposal_text, ai_analysis_details):
             "ai_analysis_details": ai_analysis_details
         }
         
-        response = requests.post(
+        response = _SESSION.post(
             f'{BACKEND_URL}/analyze/compliance',
             headers={'Content-Type': 'application/json'},
             data=json.dumps(data)
@@ -175,6 +446,34 @@ def analyze_compliance_api(proposal_text, ai_analysis_details):
         return None, f"Request failed: {str(e)}"
 
 
+def analyze_all_in_one_api(proposal_text, ai_analysis_details):
+    try:
+        data = {
+            "proposal_text": proposal_text,
+            "ai_analysis_details": ai_analysis_details
+        }
+        
+        response = _SESSION.post(
+            f'{BACKEND_URL}/analyze/all-in-one',
+            headers={'Content-Type': 'application/json'},
+            data=json.dumps(data)
+        )
+        
+        if response.status_code == 200:
+            result = response.json()
+            if result.get('status') == 'success':
+                return result.get('results', {}), None
+            else:
+                return None, f"API Error: {result.get('error', 'Unknown error')}"
+        else:
+            return None, f"HTTP Error: {response.status_code} - {response.text}"
+            
+    except requests.exceptions.RequestException as e:
+        return None, f"Request failed: {str(e)}"
+    except Exception as e:
+        return None, f"Unexpected error: {str(e)}"
+
+
 def generate_summary_api(proposal_text, ai_analysis_details, component_analysis=None, price_analysis=None, cost_realism=None, technical_analysis=None, compliance_assessment=None):
     try:
         data = {
@@ -188,7 +487,7 @@ def generate_summary_api(proposal_text, ai_analysis_details, component_analysis=
             
         }
         
-        response = requests.post(
+        response = _SESSION.post(
             f'{BACKEND_URL}/generate/summary',
             headers={'Content-Type': 'application/json'},
             data=json.dumps(data)
@@ -207,109 +506,360 @@ def generate_summary_api(proposal_text, ai_analysis_details, component_analysis=
         return None, f"Request failed: {str(e)}"
 
 
-def analyze_proposal_components(proposal_text, extra_component):
+ANALYSIS_APIS = {
+    'component_analysis': analyze_proposal,
+    'price_analysis': analyze_pricing_api,
+    'cost_realism': analyze_cost_realism_api,
+    'technical_analysis': analyze_technical_api,
+    'compliance_assessment': analyze_compliance_api,
+    'proposal_summary': generate_summary_api,
+    'all_in_one': analyze_all_in_one_api,
+}
+
+# all-in-one result key -> session_state slot it fills
+ALL_IN_ONE_KEYS = {
+    'price': 'price_analysis',
+    'cost_realism': 'cost_realism',
+    'technical': 'technical_analysis',
+    'compliance': 'compliance_assessment',
+    'summary': 'proposal_summary',
+}
+
+# Analyses that only need the proposal and component analysis (steps 3-5)
+ANALYSIS_TASKS = ('cost_realism', 'technical_analysis', 'compliance_assessment')
+
+
+class AnalysisError(Exception):
+    """Backend analysis failure; raised so st.cache_data does not store it"""
+
+
+class NotPersisted(Exception):
+    """Raised in place of running an analysis, to look up the persisted cache without calling the backend"""
+
+
+def text_key(text):
+    """Short content hash used to key cached backend calls"""
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Persisted analyses are reused for this long; Streamlit does not apply a ttl to
+# disk-persisted caches, so each result is stored with the time it was saved.
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "168")) * 3600
+
+
+# Persisted so re-analysing the same proposal after a restart skips the model
+@st.cache_data(persist="disk", max_entries=256, show_spinner=False)
+def _cached_analysis(name, text_hash, args_hash, _compute):
+    result, error = _compute()
+    if error:
+        raise AnalysisError(error)
+    return time.time(), result
+
+
+def _not_persisted():
+    raise NotPersisted
+
+
+def persisted_analysis(name, text_hash, args, compute=_not_persisted):
+    """Result of an analysis from the persisted cache, else from ``compute()``, which is persisted on success.
+
+    ``compute`` returns a ``(result, error)`` pair, like the backend API helpers.
+    With the default ``compute`` a miss returns ``(None, None)`` without calling
+    the backend. An entry older than ANALYSIS_CACHE_TTL clears the persisted
+    analyses, since Streamlit cannot drop a single one, and is computed again.
+    Must run on the script thread: st.cache_data needs its script run context.
+    """
+    args_hash = text_key(json.dumps(args, default=str))
     try:
-        with st.spinner("Analyzing proposal with AI"):
-            ai_analysis, error = analyze_proposal(proposal_text, extra_component)
-            if error:
-                st.error(f"Error in AI analysis: {error}")
-                return None, None
-        
-        components = {
-            "Executive Summary": "✅",
-            "Scope of Work": "✅",
-            "Out of Scope": "✅",
-            "Prerequisites": "✅",
-            "Deliverables": "✅",
-            "Timeline": "✅",
-            "Technology Stack": "✅",
-            "Budget": "✅",
-            "Team Structure": "✅",
-            "Risk Assessment": "✅",
-            "Success Criteria": "✅",
-        }
+        saved_at, result = _cached_analysis(name, text_hash, args_hash, compute)
+        if time.time() - saved_at > ANALYSIS_CACHE_TTL:
+            _cached_analysis.clear()
+            saved_at, result = _cached_analysis(name, text_hash, args_hash, compute)
+        return result, None
+    except NotPersisted:
+        return None, None
+    except AnalysisError as e:
+        return None, str(e)
+
+
+def clear_persisted_analyses():
+    """Delete every persisted analysis result, from memory and from disk"""
+    _cached_analysis.clear()
+
+
+def cached_analysis(name, proposal_text, *args, text_hash=None):
+    """Run a backend analysis, reusing the result for identical inputs.
+
+    The proposal is keyed by ``text_hash`` (computed once per upload) and the
+    remaining arguments by a hash of their JSON form, so the full text is never
+    re-hashed by Streamlit.
+    """
+    return persisted_analysis(
+        name,
+        text_hash or text_key(proposal_text),
+        args,
+        lambda: ANALYSIS_APIS[name](proposal_text, *args)
+    )
+
+
+def run_analyses(proposal_text, ai_analysis_details, keys=None, text_hash=None):
+    """Run the independent step 3-5 analyses concurrently.
+
+    The persisted cache is read and written here on the script thread; only the
+    backend calls for analyses it does not hold run on the worker threads.
+    Returns a ``(results, errors)`` pair of dicts keyed by session-state name.
+    """
+    keys = keys or list(ANALYSIS_TASKS)
+    text_hash = text_hash or text_key(proposal_text)
+    args = (ai_analysis_details,)
+    results, errors, futures = {}, {}, {}
+    for key in keys:
+        result, _ = persisted_analysis(key, text_hash, args)
+        if result is not None:
+            results[key] = result
+        else:
+            futures[key] = _EXECUTOR.submit(ANALYSIS_APIS[key], proposal_text, *args)
+    for key, future in futures.items():
+        result, error = persisted_analysis(key, text_hash, args, lambda: job_outcome(future))
+        if error:
+            errors[key] = error
+        else:
+            results[key] = result
+    return results, errors
+
+
+def analysis_from_file(name, proposal_path, *args):
+    """Backend analysis of the proposal stored at ``proposal_path``, read only when the job runs.
+
+    Background jobs take the path rather than the text, so the futures kept in
+    session state do not hold the full document. They call the backend
+    directly: worker threads have no script run context for st.cache_data, so
+    the persisted cache is read before submitting and written on collection.
+    """
+    try:
+        proposal_text = read_proposal_text(proposal_path)
+    except OSError:
+        return None, "The proposal was replaced before the analysis started"
+    return ANALYSIS_APIS[name](proposal_text, *args)
+
+
+def start_background_analyses(proposal_path, ai_analysis_details, text_hash):
+    """Start the step 3-5 analyses as soon as step 1 completes.
+
+    The futures are kept in session state, tagged with the document's hash,
+    and collected by ensure_analysis() when the user reaches the corresponding
+    step, so the backend calls overlap with the time spent on steps 1 and 2.
+    Analyses already in the persisted cache are not submitted.
+    """
+    discard_background_jobs()
+    futures = {}
+    for key in ANALYSIS_TASKS:
+        result, _ = persisted_analysis(key, text_hash, (ai_analysis_details,))
+        if result is None:
+            futures[key] = _EXECUTOR.submit(analysis_from_file, key, proposal_path, ai_analysis_details)
+    st.session_state.analysis_futures = {"hash": text_hash, "args": (ai_analysis_details,), "futures": futures}
+
+
+def job_outcome(future):
+    """``(result, error)`` of a background job, waiting at most ANALYSIS_TIMEOUT seconds for it"""
+    try:
+        return future.result(timeout=ANALYSIS_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        return None, f"The analysis did not finish within {ANALYSIS_TIMEOUT} seconds"
+
+
+def current_analysis_futures():
+    """Background step 3-5 jobs started for the current document; jobs for any other document are ignored"""
+    pending = st.session_state.analysis_futures
+    if not pending or pending["hash"] != st.session_state.current_file_hash:
+        return {}
+    return pending["futures"]
+
+
+def discard_background_jobs():
+    """Cancel the background analyses and summary that have not started yet, and forget all of them"""
+    pending = st.session_state.analysis_futures
+    if pending:
+        for future in pending["futures"].values():
+            future.cancel()
+    if st.session_state.summary_future:
+        st.session_state.summary_future[1].cancel()
+    st.session_state.analysis_futures = None
+    st.session_state.summary_future = None
+
+
+def ensure_analysis(key):
+    """Populate ``st.session_state[key]``, waiting on its background job if one is running.
+
+    Returns an error message, or None on success.
+    """
+    future = current_analysis_futures().pop(key, None)
+    if future is not None:
+        result, error = persisted_analysis(
+            key,
+            st.session_state.current_file_hash,
+            st.session_state.analysis_futures["args"],
+            lambda: job_outcome(future)
+        )
+    else:
+        result, error = cached_analysis(
+            key,
+            get_proposal_text(),
+            st.session_state.ai_analysis_details,
+            text_hash=st.session_state.current_file_hash
+        )
+    if not error:
+        st.session_state[key] = result
+    return error
+
+
+def summary_args():
+    """Arguments for the proposal_summary analysis, taken from the current results"""
+    component_analysis = json.dumps(dict(st.session_state.proposal_analysis)) if st.session_state.proposal_analysis else None
+    return (
+        st.session_state.ai_analysis_details,
+        component_analysis,
+        st.session_state.price_analysis,
+        st.session_state.cost_realism,
+        st.session_state.technical_analysis,
+        st.session_state.compliance_assessment,
+    )
+
+
+def start_background_summary():
+    """Start the step 6 summary while the user is still reviewing step 5, unless it is already persisted"""
+    if st.session_state.summary_future is None:
+        args = summary_args()
+        result, _ = persisted_analysis('proposal_summary', st.session_state.current_file_hash, args)
+        if result is not None:
+            return
+        future = _EXECUTOR.submit(analysis_from_file, 'proposal_summary', st.session_state.proposal_file.path, *args)
+        st.session_state.summary_future = (args, future)
+
+
+def ensure_summary():
+    """Collect the background summary if its inputs are still current, else run it now"""
+    args = summary_args()
+    pending, st.session_state.summary_future = st.session_state.summary_future, None
+    if pending is not None and pending[0] == args:
+        return persisted_analysis('proposal_summary', st.session_state.current_file_hash, args, lambda: job_outcome(pending[1]))
+    return cached_analysis(
+        'proposal_summary',
+        get_proposal_text(),
+        *args,
+        text_hash=st.session_state.current_file_hash
+    )
+
+
+def analyze_proposal_components(proposal_text, extra_component, text_hash):
+    """Stream the component analysis onto the page as it is generated, or show the persisted one"""
+    args = (extra_component,)
+    try:
+        ai_analysis, _ = persisted_analysis('component_analysis', text_hash, args)
+        if ai_analysis is None:
+            with st.expander("🔍 Analyzing proposal with AI", expanded=True):
+                ai_analysis = st.write_stream(stream_component_analysis_api(proposal_text, extra_component))
+            if ai_analysis:
+                persisted_analysis('component_analysis', text_hash, args, lambda: (ai_analysis, None))
         
-        return components, ai_analysis
+        return BASE_COMPONENTS, ai_analysis
         
-    except Exception as e:
-        st.error(f"Error analyzing proposal: {str(e)}")
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error in AI analysis: {str(e)}")
         return None, None
 
 
-def generate_pdf_report(content, filename="report.pdf"):
-    try:
-        from fpdf import FPDF
-        import re
-
-        class PDF(FPDF):
-            def header(self):
-                self.set_font('Arial', 'B', 15)
-                self.cell(0, 10, 'Proposal Analysis Report', 0, 1, 'C')
-                self.ln(10)
-
-            def footer(self):
-                self.set_y(-15)
-                self.set_font('Arial', 'I', 8)
-                self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-
-        pdf = PDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.set_font('Arial', '', 12)
-
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line:
-                pdf.ln(5)
-                continue
-
-            if line.startswith('# '):
-                pdf.set_font('Arial', 'B', 16)
-                pdf.multi_cell(0, 10, line[2:], 0, 1)
-                pdf.ln(5)
-                pdf.set_font('Arial', '', 12)
-            elif line.startswith('## '):
-                pdf.set_font('Arial', 'B', 14)
-                pdf.multi_cell(0, 8, line[3:], 0, 1)
-                pdf.ln(3)
-                pdf.set_font('Arial', '', 12)
-            elif line.startswith('### '):
-                pdf.set_font('Arial', 'B', 12)
-                pdf.multi_cell(0, 6, line[4:], 0, 1)
-                pdf.ln(2)
-                pdf.set_font('Arial', '', 12)
-            else:
-                line = re.sub(r'\*\*(.*?)\*\*', r'\1', line)
-                line = re.sub(r'\*(.*?)\*', r'\1', line)
-                line = re.sub(r'`(.*?)`', r'\1', line)
+def download_all_results(results):
+    """Combine every completed analysis into a single Markdown report"""
+    parts = [f"# Complete Proposal Analysis Report\n\n**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n---\n\n"]
+    parts.extend(
+        f"## {key.replace('_', ' ').title()}\n\n{value}\n\n---\n\n"
+        for key, value in results.items() if value
+    )
+    return "".join(parts)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_results_zip(results):
+    """One Markdown file per completed analysis, stored uncompressed in a ZIP"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for key, value in results.items():
+            if value:
+                archive.writestr(f"{key}.md", value)
+    return buffer.getvalue()
+
+
+class ReportPDF(FPDF):
+    def header(self):
+        self.set_font('Arial', 'B', 15)
+        self.cell(0, 10, 'Proposal Analysis Report', 0, 1, 'C')
+        self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_pdf_report(content):
+    """Render report markdown to PDF bytes, cached on the content"""
+    pdf = ReportPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font('Arial', '', 12)
+
+    lines = content.split('\n')
+    for line in lines:
+        line = line.strip()
+        if not line:
+            pdf.ln(5)
+            continue
+
+        header = next((h for h in PDF_HEADERS if line.startswith(h[0])), None)
+        if header:
+            prefix, size, height, spacing = header
+            pdf.set_font('Arial', 'B', size)
+            pdf.multi_cell(0, height, line[len(prefix):], 0, 1)
+            pdf.ln(spacing)
+            pdf.set_font('Arial', '', 12)
+        else:
+            if '*' in line or '`' in line:
+                line = _MD_INLINE.sub(lambda m: m.group(m.lastindex), line)
 
-                try:
-                    pdf.multi_cell(0, 6, line.encode('latin-1', 'replace').decode('latin-1'), 0, 1)
-                except:
-                    clean_line = ''.join(char if ord(char) < 128 else '?' for char in line)
-                    pdf.multi_cell(0, 6, clean_line, 0, 1)
-                pdf.ln(2)
+            pdf.multi_cell(0, 6, line.encode('latin-1', 'replace').decode('latin-1'), 0, 1)
+            pdf.ln(2)
 
-        return pdf.output(dest='S').encode('latin-1')
+    output = pdf.output(dest='S')
+    # PyFPDF returns a latin-1 str; fpdf2 already returns bytes
+    return output.encode('latin-1') if isinstance(output, str) else bytes(output)
 
+
+def generate_pdf_report(content, filename="report.pdf"):
+    try:
+        return render_pdf_report(content)
     except Exception as e:
         st.error(f"Error generating PDF: {str(e)}")
         return None
 
 
+@st.cache_resource
+def read_css(css_file):
+    return Path(css_file).read_text()
+
+
 def load_css(css_file):
-    with open(css_file, "r") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    st.markdown(f"<style>{read_css(css_file)}</style>", unsafe_allow_html=True)
 
 
+@st.cache_data(ttl=3600)
 def load_lottie_url(url):
     try:
-        r = requests.get(url)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except:
+        r = _SESSION.get(url, timeout=5)
+        return r.json() if r.ok else None
+    except requests.RequestException:
         return None
 
 
@@ -318,58 +868,78 @@ def next_step():
     st.session_state.processing = False
 
 
+def init_session_state(defaults):
+    for key, value in defaults.items():
+        st.session_state.setdefault(key, value)
+
+
 def reset_process_proposal():
-    keys_to_reset = [
-        'step',
-        'proposal_text',
-        'proposal_analysis',
-        'ai_analysis_details',
-        'proposal_summary',
-        'extra_component',
-        'current_filename',
-        'price_analysis',
-        'cost_realism',
-        'unbalanced_pricing',
-        'technical_analysis',
-        'compliance_assessment',
-        'processing'
-    ]
-    
-    for key in keys_to_reset:
-        if key in st.session_state:
-            del st.session_state[key]
-    
-    st.session_state.step = 1
-    st.session_state.proposal_text = ""
-    st.session_state.proposal_analysis = None
-    st.session_state.ai_analysis_details = None
-    st.session_state.proposal_summary = None
-    st.session_state.extra_component = ""
-    st.session_state.current_filename = None
-    st.session_state.price_analysis = None
-    st.session_state.cost_realism = None
-    st.session_state.unbalanced_pricing = None
-    st.session_state.technical_analysis = None
-    st.session_state.compliance_assessment = None
-    st.session_state.processing = False
+    discard_background_jobs()
+    if st.session_state.get('proposal_file'):
+        st.session_state.proposal_file.discard()
+    for key, value in PROPOSAL_STATE_DEFAULTS.items():
+        st.session_state[key] = value
+
+
+def start_new_document(file_hash, text):
+    """Make ``text`` the current proposal, dropping every result and background job of the previous one"""
+    discard_background_jobs()
+    for key in DOCUMENT_RESULT_KEYS:
+        st.session_state[key] = PROPOSAL_STATE_DEFAULTS[key]
+    st.session_state.current_file_hash = file_hash
+    store_proposal_text(text)
+
+
+@st.fragment
+def proposal_upload_fragment():
+    """Step 1 uploader; only this fragment reruns on uploader changes"""
+    uploaded_file = st.file_uploader(
+        "Choose a file",
+        type=["pdf", "docx", "txt"],
+        accept_multiple_files=False,
+        key="file_uploader_step1"
+    )
 
+    # Only hash the bytes when the uploader hands us a new file, not on every rerun
+    if uploaded_file is not None and uploaded_file.file_id != st.session_state.current_file_id:
+        st.session_state.current_file_id = uploaded_file.file_id
+        file_hash = file_fingerprint(uploaded_file)
+        if file_hash != st.session_state.current_file_hash:
+            st.session_state.current_filename = uploaded_file.name
+            with st.spinner("Processing and analyzing document..."):
+                extracted_text = upload_and_extract_text(uploaded_file, file_hash)
+                if extracted_text:  
+                    start_new_document(file_hash, extracted_text)
+                    st.session_state.proposal_stats = (len(extracted_text.split()), len(extracted_text))
+                    st.session_state.proposal_preview = (extracted_text[:1000] + "...") if len(extracted_text) > 1000 else extracted_text
+                    components, ai_details = analyze_proposal_components(
+                        extracted_text, 
+                        st.session_state.extra_component
+                    )   
+                    st.session_state.proposal_analysis = components
+                    st.session_state.ai_analysis_details = ai_details
+                    if components:
+                        start_background_analyses(st.session_state.proposal_file.path, ai_details, file_hash)
+            if extracted_text:
+                # New document: refresh the rest of the page and the sidebar
+                st.rerun()
 
-def main():
-    st.set_page_config(
-        page_title="RFP Proposal Analyzer",
-        page_icon="📄",
-        layout="wide"
+    if st.session_state.proposal_preview:
+        with st.expander("📄 Preview Extracted Text", expanded=False):
+            st.text(st.session_state.proposal_preview)
+
+
+@st.fragment
+def extra_component_fragment():
+    st.subheader("Additional Features")
+    extra_component = st.text_area(
+        "Additional components to analyze:",
+        placeholder="Enter any additional features you want to analyze",
+        height=100
     )
     
-    st.title("🚀 RFP Proposal Analyzer")
-    st.markdown("### Comprehensive AI-Powered Proposal Analysis System")
-    
-    if 'current_step' not in st.session_state:
-        st.session_state.current_step = 1
-    if 'proposal_text' not in st.session_state:
-        st.session_state.proposal_text = None
-    if 'new_feature' not in st.session_state:
-        st.session_state.new_feature = ""
+    if extra_component and extra_component != st.session_state.extra_component:
+        st.session_state.extra_component = extra_component
 
 
 st.set_page_config(
@@ -383,314 +953,193 @@ try:
 except:
     pass
 
-if 'mode' not in st.session_state:
-    st.session_state.mode = "with_proposal" 
-if 'step' not in st.session_state:
-    st.session_state.step = 1
-if 'proposal_text' not in st.session_state:
-    st.session_state.proposal_text = ""
-if 'proposal_analysis' not in st.session_state:
-    st.session_state.proposal_analysis = None
-if 'ai_analysis_details' not in st.session_state:
-    st.session_state.ai_analysis_details = None
-if 'proposal_summary' not in st.session_state:
-    st.session_state.proposal_summary = None
-if 'extra_component' not in st.session_state:
-    st.session_state.extra_component = ""
-if 'current_filename' not in st.session_state:  
-    st.session_state.current_filename = None 
-if 'price_analysis' not in st.session_state:
-    st.session_state.price_analysis = None
-if 'cost_realism' not in st.session_state:
-    st.session_state.cost_realism = None
-if 'unbalanced_pricing' not in st.session_state:
-    st.session_state.unbalanced_pricing = None
-if 'technical_analysis' not in st.session_state:
-    st.session_state.technical_analysis = None
-if 'compliance_assessment' not in st.session_state:
-    st.session_state.compliance_assessment = None
-if 'current_step' not in st.session_state:
-        st.session_state.current_step = 1
-if 'proposal_text' not in st.session_state:
-        st.session_state.proposal_text = None
-if 'new_feature' not in st.session_state:
-        st.session_state.new_feature = ""
-
-if 'pricing_file_text' not in st.session_state:
-    st.session_state.pricing_file_text = None
-if 'pricing_analysis_done' not in st.session_state:
-    st.session_state.pricing_analysis_done = False
-
-st.markdown("""
-<style>
-.main-header {
-    text-align: center;
-    padding: 1rem 0;
-    background: linear-gradient(90deg, #1f77b4, #17becf);
-    color: white;
-    border-radius: 10px;
-    margin-bottom: 2rem;
-}
-
-.component-card {
-    background: #f8f9fa;
-    padding: 1rem;
-    border-radius: 8px;
-    border-left: 4px solid #28a745;
-    margin: 0.5rem 0;
-}
-
-.component-card.missing {
-    border-left-color: #dc3545;
-}
-
-.progress-step {
-    padding: 0.5rem;
-    margin: 0.25rem 0;
-    border-radius: 5px;
-    background: #f1f3f4;
-}
-
-.progress-step.completed {
-    background: #d4edda;
-    border-left: 3px solid #28a745;
-}
-
-.progress-step.current {
-    background: #fff3cd;
-    border-left: 3px solid #ffc107;
-}
-
-.create-proposal-btn {
-    position: fixed;
-    top: 100px;
-    right: 20px;
-    z-index: 1000;
-}
-
-.analysis-section {
-    background: #f8f9fa;
-    padding: 1.5rem;
-    border-radius: 10px;
-    margin: 1rem 0;
-    border: 1px solid #dee2e6;
-}
-</style>
-""", unsafe_allow_html=True)
-
-st.markdown('<div class="main-header"><h1> Project Management Tool</h1><p>Intelligent Proposal Analysis & RFP Management</p></div>', unsafe_allow_html=True)
-
-if st.session_state.mode == "with_proposal":
-    with st.sidebar:
-        st.image("./images/yashphoto.PNG", width=200)  
-        st.title("Proposal Analysis Progress")
-        
-        analysis_steps = [
-            ("Flight Check", "✈️"),
-            ("Price Analysis", "💰"),  
-            ("Cost Realism Check", "📊"),             
-            ("Technical Analysis Review", "🔧"),      
-            ("Compliance Assessment", "📋"),         
-            ("Generate Summary Report", "📄"),
-        ]
+@st.fragment
+def render_sidebar():
+    """Sidebar progress tracker; reruns on its own when its widgets change"""
+    st.image("./images/yashphoto.PNG", width=200)  
+    st.title("Proposal Analysis Progress")
+    
+    current_step = 1
+    
+    if st.session_state.proposal_file and st.session_state.proposal_analysis:
+        current_step = 2
+    if st.session_state.price_analysis:
+        current_step = 3
+    if st.session_state.cost_realism:
+        current_step = 4
+    if st.session_state.technical_analysis:
+        current_step = 5
+    if st.session_state.compliance_assessment:
+        current_step = 6
+    if st.session_state.proposal_summary:
+        current_step = 7
+
+    completion = (current_step - 1) / TOTAL_STEPS
+    st.progress(completion)
+    st.write(f"**{completion:.0%}** completed")
+    
+    add_vertical_space(1)
+    
+    cards = []
+    for i, (step_name, step_icon) in enumerate(ANALYSIS_STEPS, 1):
+        if i < current_step:
+            icon = "✅" 
+            status_class = "completed"
+        elif i == current_step:
+            icon = step_icon 
+            status_class = "current"
+        else:
+            icon = step_icon  
+            status_class = ""
         
-        total_steps = len(analysis_steps)
-        current_step = 1
+        cards.append(f'<div class="progress-step {status_class}"><strong>{icon} Step {i}: {step_name}</strong></div>')
+    st.markdown(''.join(cards), unsafe_allow_html=True)
+    
+    add_vertical_space(2)
+    
+    if st.button("🔄 Reset Analysis", use_container_width=True):
+        reset_process_proposal()
+        st.rerun()
+    
+    if st.button("🗑️ Clear Saved Analyses", use_container_width=True,
+                 help="Forget the analysis results kept on disk, so every analysis runs again"):
+        clear_persisted_analyses()
+        st.toast("Saved analyses cleared")
+    
+    with st.expander("ℹ️ Help & Tips"):
+        st.write("""
+        **Enhanced AI Analysis Features:**
+        - 🤖 AI-powered component detection
+        - ✅ 15+ component completeness check
+        - 📊 Quality assessment scoring
+        - 🎯 Compliance verification
+        - 💡 Detailed improvement recommendations
+        - 📋 Executive summary generation
         
-        if st.session_state.proposal_text and st.session_state.proposal_analysis:
-            current_step = 2
-        if st.session_state.price_analysis:
-            current_step = 3
-        if st.session_state.cost_realism:
-            current_step = 4
-        if st.session_state.technical_analysis:
-            current_step = 5
-        if st.session_state.compliance_assessment:
-            current_step = 6
-        if st.session_state.proposal_summary:
-            current_step = 7
+        **Supported Formats:**
+        - PDF documents
+        - Word documents (.docx)
+        - Text files (.txt)
+        """)
+
 
-        completion = int((current_step - 1) / total_steps * 100)
-        st.progress(completion / 100)
-        st.write(f"**{completion}%** completed")
+def step_1_body():
+    with st.container():
+        st.subheader("Step 1: Flight Check")
+        st.write("Upload your proposal document and get instant AI-powered component analysis")
         
-        add_vertical_space(1)
+        col1, col2 = st.columns([2, 1])
         
-        for i, (step_name, step_icon) in enumerate(analysis_steps, 1):
-            if i < current_step:
-                icon = "✅" 
-                status_class = "completed"
-            elif i == current_step:
-                icon = step_icon 
-                status_class = "current"
-            else:
-                icon = step_icon  
-                status_class = ""
-            
-            st.markdown(f'<div class="progress-step {status_class}"><strong>{icon} Step {i}: {step_name}</strong></div>', unsafe_allow_html=True)
+        with col1:
+            proposal_upload_fragment()
         
-        add_vertical_space(2)
+        with col2:
+            extra_component_fragment()
         
-        if st.button("🔄 Reset Analysis", use_container_width=True):
-            reset_process_proposal()
-            st.rerun()
+        if st.session_state.current_filename:
+            word_count, char_count = st.session_state.proposal_stats
+            st.info(f"📄 Document: **{st.session_state.current_filename}** | Words: **{word_count:,}** | Length: **{char_count:,} characters**")
         
-        with st.expander("ℹ️ Help & Tips"):
-            st.write("""
-            **Enhanced AI Analysis Features:**
-            - 🤖 AI-powered component detection
-            - ✅ 15+ component completeness check
-            - 📊 Quality assessment scoring
-            - 🎯 Compliance verification
-            - 💡 Detailed improvement recommendations
-            - 📋 Executive summary generation
-            
-            **Supported Formats:**
-            - PDF documents
-            - Word documents (.docx)
-            - Text files (.txt)
-            """)
-
-    colored_header(
-        label="AI-Powered Proposal Analysis Dashboard",
-        description="Upload and analyze your proposal document with advanced AI analysis",
-        color_name="blue-green-70"
-    )
-    
-    if st.session_state.step == 1:
-        with st.container():
-            st.subheader("Step 1: Flight Check")
-            st.write("Upload your proposal document and get instant AI-powered component analysis")
+        if st.session_state.proposal_analysis:
+            st.success("✅ Document processed and analyzed successfully!")
             
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                uploaded_file = st.file_uploader(
-                    "Choose a file",
-                    type=["pdf", "docx", "txt"],
-                    accept_multiple_files=False,
-                    key="file_uploader_step1"
-                )
-            
-                if uploaded_file is not None:
-                    st.session_state.current_filename = uploaded_file.name
-                    with st.spinner("Processing and analyzing document..."):
-                        extracted_text = upload_and_extract_text(uploaded_file)
-                        if extracted_text:  
-                            st.session_state.proposal_text = extracted_text
-                            components, ai_details = analyze_proposal_components(
-                                st.session_state.proposal_text, 
-                                st.session_state.extra_component
-                            )   
-                            st.session_state.proposal_analysis = components
-                            st.session_state.ai_analysis_details = ai_details
+            st.markdown("### 📋 Proposal Component Analysis")
+            components = st.session_state.proposal_analysis
+            cards = ''.join(
+                f'<div class="component-card"><strong>{present} {component_name}</strong></div>'
+                for component_name, present in components.items()
+            )
+            st.markdown(f'<div class="component-grid">{cards}</div>', unsafe_allow_html=True)
             
-            with col2:
-                st.subheader("Additional Features")
-                extra_component = st.text_area(
-                    "Additional components to analyze:",
-                    placeholder="Enter any additional features you want to analyze",
-                    height=100
-                )
-                
-                if extra_component:
-                    st.session_state.extra_component = extra_component
+            if st.session_state.ai_analysis_details:
+                with st.expander("🔍 View Detailed Component Analysis"):
+                    st.markdown(st.session_state.ai_analysis_details)
             
-            if st.session_state.current_filename:
-                st.info(f"📄 Document: **{st.session_state.current_filename}** | Length: **{len(st.session_state.proposal_text):,} characters**")
+            if st.button("Proceed to Price Analysis ➡️", type="primary", use_container_width=True):
+                st.session_state.step = 2
+                st.rerun(scope="fragment")
             
-            if st.session_state.proposal_analysis:
-                st.success("✅ Document processed and analyzed successfully!")
-                
-                st.markdown("### 📋 Proposal Component Analysis")
-                components = st.session_state.proposal_analysis
-                component_list = list(components.items())
-                
-                for i in range(0, len(component_list), 2):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        if i < len(component_list):
-                            component_name, present = component_list[i]
-                            card_class = "component-card" 
-                            st.markdown(f'<div class="{card_class}"><strong>{present} {component_name}</strong></div>', 
-                                        unsafe_allow_html=True)
-                    
-                    with col2:
-                        if i + 1 < len(component_list):
-                            component_name, present = component_list[i + 1]
-                            st.markdown(f'<div class="{card_class}"><strong>{present} {component_name}</strong></div>', 
-                                        unsafe_allow_html=True)
-                
-                if st.session_state.ai_analysis_details:
-                    with st.expander("🔍 View Detailed Component Analysis"):
-                        st.markdown(st.session_state.ai_analysis_details)
-                
-                if st.button("Proceed to Price Analysis ➡️", type="primary", use_container_width=True):
-                    st.session_state.step = 2
-                    st.rerun()
-            
-            elif st.session_state.proposal_text:
-                if st.button("🔍 Analyze Proposal Components", type="primary", use_container_width=True):
-                    with st.spinner("Analyzing proposal components..."):
-                        components, ai_details = analyze_proposal_components(
-                            st.session_state.proposal_text, 
-                            st.session_state.extra_component
-                        )
-                        st.session_state.proposal_analysis = components
-                        st.session_state.ai_analysis_details = ai_details
+            if st.button("⚡ Fast Summary", use_container_width=True,
+                         help="Run every analysis in a single request and go straight to the summary"):
+                with st.spinner("Running all analyses..."):
+                    results, error = cached_analysis(
+                        'all_in_one',
+                        get_proposal_text(),
+                        st.session_state.ai_analysis_details,
+                        text_hash=st.session_state.current_file_hash
+                    )
+                if error:
+                    st.error(f"Fast summary failed: {error}")
+                else:
+                    # Only fill, and only mark done, the analyses that actually came back
+                    missing = [key for key in ALL_IN_ONE_KEYS if not results.get(key)]
+                    for key, state_key in ALL_IN_ONE_KEYS.items():
+                        if results.get(key):
+                            st.session_state[state_key] = results[key]
+                    st.session_state.pricing_analysis_done = bool(st.session_state.price_analysis)
+                    if missing:
+                        st.error(f"Fast summary did not return: {', '.join(missing)}")
+                    else:
+                        discard_background_jobs()
+                        st.session_state.step = 6
                         st.rerun()
-    
-    elif st.session_state.step == 2:
-        with st.container():
-            st.subheader("Step 2: Price Analysis")
-            st.write("Upload your cost breakdown or enter it manually to analyze pricing fairness.")
-
-        # Initialize session state
-        if 'costing_file_text' not in st.session_state:
-            st.session_state.costing_file_text = None
-        if 'manual_costing_text' not in st.session_state:
-            st.session_state.manual_costing_text = ""
-        if 'pricing_analysis_done' not in st.session_state:
-            st.session_state.pricing_analysis_done = False
-        if 'final_costing_text' not in st.session_state:
-            st.session_state.final_costing_text = None
+        
+        elif st.session_state.proposal_file:
+            if st.button("🔍 Analyze Proposal Components", type="primary", use_container_width=True):
+                with st.spinner("Analyzing proposal components..."):
+                    components, ai_details = analyze_proposal_components(
+                        get_proposal_text(), 
+                        st.session_state.extra_component,
+                        st.session_state.current_file_hash
+                    )
+                    st.session_state.proposal_analysis = components
+                    st.session_state.ai_analysis_details = ai_details
+                    if components:
+                        start_background_analyses(
+                            st.session_state.proposal_file.path,
+                            ai_details,
+                            st.session_state.current_file_hash
+                        )
+                    st.rerun()
 
-        # Two-column layout (same as Step 1)
-        col1, col2 = st.columns([2, 1])
 
-        with col1:
-            st.write("📁 Upload Costing File (PDF, DOCX, TXT)")
-            costing_file = st.file_uploader(
-                "Choose a costing file",
-                type=["pdf", "docx", "txt"],
-                key="costing_file_uploader_step2",
-                label_visibility="collapsed"
-            )
+def step_2_body():
+    with st.container():
+        st.subheader("Step 2: Price Analysis")
+        st.write("Upload your cost breakdown or enter it manually to analyze pricing fairness.")
 
-            if costing_file is not None and st.session_state.costing_file_text is None:
-                with st.spinner("📄 Extracting text from costing file..."):
-                    try:
-                        files = {"file": (costing_file.name, costing_file, costing_file.type)}
-                        response = requests.post(f'{BACKEND_URL}/coast/proposal', files=files)
-                        if response.status_code == 200:
-                            data = response.json()
-                            st.session_state.costing_file_text = data["text"]
-                            st.success(" Costing file processed!")
-                            st.session_state.final_costing_text = None
-                            st.session_state.pricing_analysis_done = False
-                        else:
-                            st.error(f" Failed: {response.text}")
-                    except Exception as e:
-                        st.error(f" Error: {e}")
-
-            # Show extracted file text
-            if st.session_state.costing_file_text:
-                with st.expander("📄 Preview Uploaded Costing Data", expanded=False):
-                    st.text_area("", st.session_state.costing_file_text, height=200, disabled=True)
+    # Two-column layout (same as Step 1)
+    col1, col2 = st.columns([2, 1])
 
-        with col2:
-            st.write("📝 Manual Costing Input")
+    with col1:
+        st.write("📁 Upload Costing File (PDF, DOCX, TXT)")
+        costing_file = st.file_uploader(
+            "Choose a costing file",
+            type=["pdf", "docx", "txt"],
+            key="costing_file_uploader_step2",
+            label_visibility="collapsed"
+        )
+
+        # Extract once per uploaded file; the extraction itself is cached on content hash
+        if costing_file is not None and costing_file.file_id != st.session_state.costing_file_id:
+            st.session_state.costing_file_id = costing_file.file_id
+            with st.spinner("📄 Extracting text from costing file..."):
+                costing_text = upload_and_extract_text(costing_file, endpoint="/coast/proposal")
+                if costing_text:
+                    st.session_state.costing_file_text = costing_text
+                    st.success(" Costing file processed!")
+                    st.session_state.final_costing_text = None
+                    st.session_state.pricing_analysis_done = False
+
+        # Show extracted file text
+        if st.session_state.costing_file_text:
+            with st.expander("📄 Preview Uploaded Costing Data", expanded=False):
+                st.text_area("", st.session_state.costing_file_text, height=200, disabled=True)
+
+    with col2:
+        st.write("📝 Manual Costing Input")
+        # Edits only reach the script when the form is submitted
+        with st.form("manual_costing_form", border=False):
             manual_input = st.text_area(
                 "Enter cost details",
                 value=st.session_state.manual_costing_text,
@@ -698,188 +1147,186 @@ if st.session_state.mode == "with_proposal":
                 placeholder="Enter the price of proposal ",
                 key="manual_costing_input"
             )
-            if manual_input.strip() != st.session_state.manual_costing_text:
-                st.session_state.manual_costing_text = manual_input
-                st.session_state.final_costing_text = None
-                st.session_state.pricing_analysis_done = False
-
-            # Show manual input preview
-            if st.session_state.manual_costing_text:
-                with st.expander("✏️ Preview", expanded=False):
-                    st.text_area("", st.session_state.manual_costing_text, height=100, disabled=True)
-
-        # Determine final costing text
-        final_costing_text = None
-        if st.session_state.manual_costing_text.strip():
-            final_costing_text = st.session_state.manual_costing_text
-        elif st.session_state.costing_file_text:
-            final_costing_text = st.session_state.costing_file_text
-
-        if final_costing_text and final_costing_text != st.session_state.final_costing_text:
-            st.session_state.final_costing_text = final_costing_text
+            st.form_submit_button("Apply Costing", use_container_width=True)
+        if manual_input.strip() != st.session_state.manual_costing_text:
+            st.session_state.manual_costing_text = manual_input.strip()
+            st.session_state.final_costing_text = None
             st.session_state.pricing_analysis_done = False
 
-        if st.session_state.final_costing_text and not st.session_state.pricing_analysis_done:
-            if st.button("🔍 Analyze Pricing", type="primary", use_container_width=True):
-                with st.spinner("🔍 Running price fairness analysis..."):
-                    try:
-                        data = {
-                            "proposal_text": st.session_state.proposal_text,
-                            "ai_analysis_details":st.session_state.ai_analysis_details,
-                            "costing_file_text": st.session_state.costing_file_text,
-                            "manual_costing_text": st.session_state.manual_costing_text
-                        }
-                        response = requests.post(f'{BACKEND_URL}/analyze/pricing', json=data)
-                        if response.status_code == 200:
-                            result = response.json()["result"]
-                            st.session_state.price_analysis = result
-                            st.session_state.pricing_analysis_done = True
-                            st.success("Price analysis completed!")
-                        else:
-                            st.error(f"Analysis failed: {response.text}")
-                    except Exception as e:
-                        st.error(f"API error: {str(e)}")
-
-        if st.session_state.pricing_analysis_done and st.session_state.price_analysis:
-            with st.expander("💰 Price Analysis Results", expanded=True):
-                st.markdown(st.session_state.price_analysis)
-
-        if st.session_state.pricing_analysis_done:
-            if st.button("Proceed to Cost Realism Check", use_container_width=True):
-                st.session_state.step = 3
+        # Show manual input preview
+        if st.session_state.manual_costing_text:
+            with st.expander("✏️ Preview", expanded=False):
+                st.text_area("", st.session_state.manual_costing_text, height=100, disabled=True)
+
+    # Determine final costing text
+    final_costing_text = None
+    if st.session_state.manual_costing_text.strip():
+        final_costing_text = st.session_state.manual_costing_text
+    elif st.session_state.costing_file_text:
+        final_costing_text = st.session_state.costing_file_text
+
+    if final_costing_text and final_costing_text != st.session_state.final_costing_text:
+        st.session_state.final_costing_text = final_costing_text
+        st.session_state.pricing_analysis_done = False
+
+    if st.session_state.final_costing_text and not st.session_state.pricing_analysis_done:
+        if st.button("🔍 Analyze Pricing", type="primary", use_container_width=True):
+            args = (
+                st.session_state.ai_analysis_details,
+                st.session_state.costing_file_text,
+                st.session_state.manual_costing_text
+            )
+            try:
+                result, _ = persisted_analysis('price_analysis', st.session_state.current_file_hash, args)
+                if result is None:
+                    with st.expander("💰 Price Analysis Results", expanded=True):
+                        result = st.write_stream(stream_pricing_api(get_proposal_text(), *args))
+                    if result:
+                        persisted_analysis('price_analysis', st.session_state.current_file_hash, args, lambda: (result, None))
+                st.session_state.price_analysis = result
+                st.session_state.pricing_analysis_done = True
+                st.toast("Price analysis completed!")
                 st.rerun()
-    
+            except requests.exceptions.RequestException as e:
+                st.error(f"Analysis failed: {str(e)}")
 
-    elif st.session_state.step == 3:
-        with st.container():
-            st.subheader("Step 3: Cost Realism Analysis")
-            st.write("Evaluating if proposed costs are realistic for the work scope...")
-            
-            if not st.session_state.cost_realism:
-                with st.spinner("Analyzing cost realism per FAR 15.404-1(d)..."):
-                    result, error = analyze_cost_realism_api(
-                        st.session_state.proposal_text, 
-                        st.session_state.ai_analysis_details
-                    )
-                    if error:
-                        st.error(f"Error in cost realism analysis: {error}")
-                    else:
-                        st.session_state.cost_realism = result
-            
-            if st.session_state.cost_realism:
-                with st.expander("💰 Cost Realism Analysis", expanded=True):
-                    st.markdown(st.session_state.cost_realism)
-                    
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("⬅️ Back to Price Analysis"):
-                        st.session_state.step = 2
-                        st.rerun()
-                with col2:
-                    if st.button("Proceed to Technical Analysis ➡️", type="primary"):
-                        st.session_state.step = 4
-                        st.rerun()
+    if st.session_state.pricing_analysis_done and st.session_state.price_analysis:
+        with st.expander("💰 Price Analysis Results", expanded=True):
+            st.markdown(st.session_state.price_analysis)
 
-    elif st.session_state.step == 4:
-        with st.container():
-            st.subheader("Step 4: Technical Analysis Review")
-            st.write("Reviewing technical aspects and feasibility...")
-            
-            if not st.session_state.technical_analysis:
-                with st.spinner("Performing technical analysis review..."):
-                    result, error = analyze_technical_api(
-                        st.session_state.proposal_text, 
-                        st.session_state.ai_analysis_details
-                    )
-                    if error:
-                        st.error(f"Error in technical analysis: {error}")
-                    else:
-                        st.session_state.technical_analysis = result
-            
-            if st.session_state.technical_analysis:
-                with st.expander("🔧 Technical Analysis", expanded=True):
-                    st.markdown(st.session_state.technical_analysis)
-                    
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("⬅️ Back to Cost Realism"):
-                        st.session_state.step = 3
-                        st.rerun()
-                with col2:
-                    if st.button("Proceed to Compliance Assessment ➡️", type="primary"):
-                        st.session_state.step = 5
-                        st.rerun()
+    if st.session_state.pricing_analysis_done:
+        if st.button("Proceed to Cost Realism Check", use_container_width=True):
+            st.session_state.step = 3
+            st.rerun()
 
-    elif st.session_state.step == 5:
-        with st.container():
-            st.subheader("Step 5: Compliance Assessment")
-            st.write("Assessing compliance with requirements and regulations...")
-            
-            if not st.session_state.compliance_assessment:
-                with st.spinner("Performing compliance assessment..."):
-                    result, error = analyze_compliance_api(
-                        st.session_state.proposal_text, 
-                        st.session_state.ai_analysis_details
+
+def step_3_body():
+    with st.container():
+        st.subheader("Step 3: Cost Realism Analysis")
+        st.write("Evaluating if proposed costs are realistic for the work scope...")
+        
+        if not st.session_state.cost_realism:
+            with st.spinner("Analyzing cost realism per FAR 15.404-1(d)..."):
+                if current_analysis_futures():
+                    error = ensure_analysis('cost_realism')
+                else:
+                    pending = [key for key in ANALYSIS_TASKS if not st.session_state[key]]
+                    results, errors = run_analyses(
+                        get_proposal_text(), 
+                        st.session_state.ai_analysis_details,
+                        pending,
+                        text_hash=st.session_state.current_file_hash
                     )
-                    if error:
-                        st.error(f"Error in compliance assessment: {error}")
-                    else:
-                        st.session_state.compliance_assessment = result
-            
-            if st.session_state.compliance_assessment:
-                with st.expander("⚖️ Compliance Assessment", expanded=True):
-                    st.markdown(st.session_state.compliance_assessment)
-                    
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    if st.button("⬅️ Back to Technical Analysis"):
-                        st.session_state.step = 4
-                        st.rerun()
-                with col2:
-                    if st.button("Generate Summary Report ➡️", type="primary"):
-                        st.session_state.step = 6
-                        st.rerun()
+                    for key, result in results.items():
+                        st.session_state[key] = result
+                    error = errors.get('cost_realism')
+                if error:
+                    st.error(f"Error in cost realism analysis: {error}")
+        
+        if st.session_state.cost_realism:
+            with st.expander("💰 Cost Realism Analysis", expanded=True):
+                st.markdown(st.session_state.cost_realism)
+                
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button("⬅️ Back to Price Analysis"):
+                    st.session_state.step = 2
+                    st.rerun(scope="fragment")
+            with col2:
+                if st.button("Proceed to Technical Analysis ➡️", type="primary"):
+                    st.session_state.step = 4
+                    st.rerun()
 
-    elif st.session_state.step == 6:
-        with st.container():
-            st.subheader("Step 6: Executive Summary Report")
+
+def step_4_body():
+    with st.container():
+        st.subheader("Step 4: Technical Analysis Review")
+        st.write("Reviewing technical aspects and feasibility...")
+        
+        if not st.session_state.technical_analysis:
+            with st.spinner("Performing technical analysis review..."):
+                error = ensure_analysis('technical_analysis')
+                if error:
+                    st.error(f"Error in technical analysis: {error}")
+        
+        if st.session_state.technical_analysis:
+            with st.expander("🔧 Technical Analysis", expanded=True):
+                st.markdown(st.session_state.technical_analysis)
+                
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button("⬅️ Back to Cost Realism"):
+                    st.session_state.step = 3
+                    st.rerun(scope="fragment")
+            with col2:
+                if st.button("Proceed to Compliance Assessment ➡️", type="primary"):
+                    st.session_state.step = 5
+                    st.rerun()
+
+
+def step_5_body():
+    with st.container():
+        st.subheader("Step 5: Compliance Assessment")
+        st.write("Assessing compliance with requirements and regulations...")
+        
+        if not st.session_state.compliance_assessment:
+            with st.spinner("Performing compliance assessment..."):
+                error = ensure_analysis('compliance_assessment')
+                if error:
+                    st.error(f"Error in compliance assessment: {error}")
+        
+        if st.session_state.compliance_assessment:
             if not st.session_state.proposal_summary:
-                with st.spinner("Generating comprehensive summary report..."):
-                    component_analysis_for_api = json.dumps(st.session_state.proposal_analysis) if st.session_state.proposal_analysis else None
+                start_background_summary()
 
-                    result, error = generate_summary_api(
-                        st.session_state.proposal_text, 
-                        st.session_state.ai_analysis_details,
-                        component_analysis_for_api,
-                        st.session_state.price_analysis,
-                        st.session_state.cost_realism,
-                        st.session_state.technical_analysis,
-                        st.session_state.compliance_assessment
-                    )
-                    if error:
-                        st.error(f"Error generating summary: {error}")
-                    else:
-                        st.session_state.proposal_summary = result
-            
-            if st.session_state.proposal_summary:
-                st.success("✅ Summary report generated successfully!")
-                st.markdown('<div class="analysis-content">', unsafe_allow_html=True)
-                st.markdown(st.session_state.proposal_summary)
-                st.markdown('</div>', unsafe_allow_html=True)
+            with st.expander("⚖️ Compliance Assessment", expanded=True):
+                st.markdown(st.session_state.compliance_assessment)
                 
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col1:
-                    if st.button("⬅️ Back to Compliance Assessment"):
-                        st.session_state.step = 5
-                        st.rerun()
-                with col2:
-                    st.download_button(
-                        label="📥 Download Summary Report (MD)",
-                        data=st.session_state.proposal_summary,
-                        file_name=f"proposal_summary_{datetime.now().strftime('%Y%m%d')}.md",
-                        mime="text/markdown"
-                    )
-                with col3:
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button("⬅️ Back to Technical Analysis"):
+                    st.session_state.step = 4
+                    st.rerun(scope="fragment")
+            with col2:
+                if st.button("Generate Summary Report ➡️", type="primary"):
+                    st.session_state.step = 6
+                    st.rerun()
+
+
+def step_6_body():
+    with st.container():
+        st.subheader("Step 6: Executive Summary Report")
+        if not st.session_state.proposal_summary:
+            with st.spinner("Generating comprehensive summary report..."):
+                result, error = ensure_summary()
+                if error:
+                    st.error(f"Error generating summary: {error}")
+                else:
+                    st.session_state.proposal_summary = result
+        
+        if st.session_state.proposal_summary:
+            st.success("✅ Summary report generated successfully!")
+            st.markdown(st.session_state.proposal_summary)
+            
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                if st.button("⬅️ Back to Compliance Assessment"):
+                    st.session_state.step = 5
+                    st.rerun(scope="fragment")
+            with col2:
+                st.download_button(
+                    label="📥 Download Summary Report (MD)",
+                    data=st.session_state.proposal_summary,
+                    file_name=f"proposal_summary_{datetime.now().strftime('%Y%m%d')}.md",
+                    mime="text/markdown"
+                )
+            with col3:
+                # Build the PDF only once the user asks for it
+                if not st.session_state.pdf_requested:
+                    if st.button("📄 Prepare PDF Report"):
+                        st.session_state.pdf_requested = True
+                        st.rerun(scope="fragment")
+                else:
                     pdf_data = generate_pdf_report(
                         st.session_state.proposal_summary, 
                         f"proposal_summary_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -893,10 +1340,70 @@ if st.session_state.mode == "with_proposal":
                         )
                     else:
                         st.warning("PDF generation failed")
+            
+            all_results = {
+                'component_analysis': st.session_state.ai_analysis_details,
+                'price_analysis': st.session_state.price_analysis,
+                'cost_realism': st.session_state.cost_realism,
+                'technical_analysis': st.session_state.technical_analysis,
+                'compliance_assessment': st.session_state.compliance_assessment,
+                'executive_summary': st.session_state.proposal_summary,
+            }
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    label="📥 Download All Results (MD)",
+                    data=download_all_results(all_results),
+                    file_name=f"proposal_analysis_{datetime.now().strftime('%Y%m%d')}.md",
+                    mime="text/markdown",
+                    use_container_width=True
+                )
+            with col2:
+                st.download_button(
+                    label="💾 Download All Results (ZIP)",
+                    data=build_results_zip(all_results),
+                    file_name=f"proposal_analysis_{datetime.now().strftime('%Y%m%d')}.zip",
+                    mime="application/zip",
+                    use_container_width=True
+                )
+
+
+STEP_BODIES = {
+    1: step_1_body,
+    2: step_2_body,
+    3: step_3_body,
+    4: step_4_body,
+    5: step_5_body,
+    6: step_6_body,
+}
+
+
+@st.fragment
+def render_current_step():
+    """Body of the current step; navigating back or into step 2 reruns only this fragment"""
+    STEP_BODIES[st.session_state.step]()
+
+
+init_session_state(SESSION_DEFAULTS)
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+st.markdown('<div class="main-header"><h1> Project Management Tool</h1><p>Intelligent Proposal Analysis & RFP Management</p></div>', unsafe_allow_html=True)
+
+if st.session_state.mode == "with_proposal":
+    with st.sidebar:
+        render_sidebar()
+
+    colored_header(
+        label="AI-Powered Proposal Analysis Dashboard",
+        description="Upload and analyze your proposal document with advanced AI analysis",
+        color_name="blue-green-70"
+    )
+    
+    render_current_step()
 
 elif st.session_state.mode == "create_proposal":
     pass
-style_metric_cards()
 
 
 